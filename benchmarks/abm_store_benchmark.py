@@ -0,0 +1,77 @@
+"""Compare the object and the array-backed (agent_store=True) Simulation.
+
+Usage (from the repository root):
+    python benchmarks/abm_store_benchmark.py --consumers 1000000
+
+Both simulations use the same random seed and income, children and segment distributions
+(the store draws them in bulk with NumPy), so their rates should be close. Memory is the
+peak traced by tracemalloc during each phase.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from real_estate_toolkit.data.loader import DataLoader
+from real_estate_toolkit.agent_based_model.simulation import (
+    Simulation, AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism
+)
+
+
+def timed(label: str, function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<20} {elapsed:10.3f} s {peak / 2**20:10.1f} MiB")
+    return elapsed, peak
+
+
+def run(consumers: int, seed: int) -> None:
+    data = DataLoader(ROOT / "src" / "files" / "train.csv").load_table(clean=True).to_dicts()
+    print(f"{len(data):,} houses, {consumers:,} consumers")
+
+    results = {}
+    for name, agent_store in (("objects", False), ("agent_store", True)):
+        simulation = Simulation(
+            housing_market_data=data,
+            consumers_number=consumers,
+            years=5,
+            annual_income=AnnualIncomeStatistics(minimum=30000.0, average=60000.0, standard_deviation=20000.0, maximum=150000.0),
+            children_range=ChildrenRange(minimum=0, maximum=5),
+            cleaning_market_mechanism=CleaningMarketMechanism.INCOME_ORDER_DESCENDANT,
+            agent_store=agent_store,
+            seed=seed,
+        )
+        print(name)
+        total = 0.0
+        for label, phase in (
+            ("create_housing_market", simulation.create_housing_market),
+            ("create_consumers", simulation.create_consumers),
+            ("compute_savings", simulation.compute_consumers_savings),
+            ("clean_the_market", simulation.clean_the_market),
+        ):
+            elapsed, _ = timed(label, phase)
+            total += elapsed
+        print(f"  {'total':<20} {total:10.3f} s")
+        report = simulation.clearing_report
+        print(f"  {report.matches:,} matches, {report.matches_per_second:,.0f} matches/s")
+        results[name] = (total, simulation.compute_owners_population_rate(), simulation.compute_houses_availability_rate())
+
+    for name, (total, owners_rate, availability_rate) in results.items():
+        print(f"{name:<12} owners rate {owners_rate}, availability rate {availability_rate}")
+    print(f"Speedup: {results['objects'][0] / results['agent_store'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--consumers", type=int, default=200_000, help="number of consumers")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of both simulations")
+    arguments = parser.parse_args()
+    run(arguments.consumers, arguments.seed)
@@ -0,0 +1,71 @@
+"""Benchmark Descriptor against DescriptorColumnar on train.csv scaled up.
+
+Usage (from the repository root):
+    python benchmarks/descriptor_benchmark.py --rows 2000000
+
+The cleaned rows of train.csv are repeated until `--rows` is reached. Repeated rows
+share the same dictionaries, so memory stays reasonable even for millions of rows.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from real_estate_toolkit.data.loader import DataLoader
+from real_estate_toolkit.data.cleaner import Cleaner
+from real_estate_toolkit.data.descriptor import Descriptor, DescriptorColumnar
+
+
+def load_scaled_rows(rows: int):
+    loader = DataLoader(ROOT / "src" / "files" / "train.csv")
+    cleaner = Cleaner(loader.load_data_from_csv())
+    cleaner.rename_with_best_practices()
+    data = cleaner.na_to_none()
+    repeats = rows // len(data) + 1
+    return (data * repeats)[:rows]
+
+
+def timed(label: str, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<16} {elapsed:10.3f} s")
+    return result, elapsed
+
+
+def run(rows: int) -> None:
+    data = load_scaled_rows(rows)
+    numeric_columns = [key for key, value in data[0].items() if isinstance(value, (int, float))]
+    print(f"{len(data):,} rows, {len(data[0])} columns ({len(numeric_columns)} numeric)")
+
+    totals = {}
+    for name, cls in (("Descriptor", Descriptor), ("DescriptorColumnar", DescriptorColumnar)):
+        print(name)
+        descriptor, total = timed("build", cls, data)
+        results = []
+        for label, method, args in (
+            ("none_ratio", descriptor.none_ratio, ()),
+            ("average", descriptor.average, (numeric_columns,)),
+            ("median", descriptor.median, (numeric_columns,)),
+            ("percentile(75)", descriptor.percentile, (numeric_columns, 75)),
+            ("type_and_mode", descriptor.type_and_mode, ()),
+        ):
+            result, elapsed = timed(label, method, *args)
+            results.append(result)
+            total += elapsed
+        print(f"  {'total':<16} {total:10.3f} s")
+        totals[name] = (total, results)
+
+    baseline, baseline_results = totals["Descriptor"]
+    columnar, columnar_results = totals["DescriptorColumnar"]
+    assert baseline_results == columnar_results, "Columnar results differ from Descriptor"
+    print(f"Speedup: {baseline / columnar:.1f}x (identical results)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of rows after scaling")
+    run(parser.parse_args().rows)
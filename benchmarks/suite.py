@@ -0,0 +1,342 @@
+"""Benchmark suite of the data, agent-based model and analytics hot paths.
+
+Usage (from the repository root):
+    python benchmarks/suite.py --scales 1 10 100
+    python benchmarks/suite.py --scales 1 10 --baseline benchmarks/results/baseline.json
+
+Every case runs on synthetic datasets with the schema of train.csv at each scale (1x is
+1,460 rows, 1000x is 1,460,000): rows are resampled from train.csv with a little noise
+on the prices and areas, and new ids. The datasets are written once to --data-dir and
+reused. Cases that build one Python dictionary per row stop at a lower scale (see
+max_scale; --all-scales runs them anyway).
+
+Results (min and median seconds of --repeats runs per case and scale, with the machine
+and commit) are written as JSON to --output. With --baseline, every result is compared
+with the same case and scale of an earlier results file, and the run fails (exit status
+1) when a median is slower than the baseline by more than the threshold of the case.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import polars as pl
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from real_estate_toolkit.data.loader import DataLoader
+from real_estate_toolkit.data.cleaner import Cleaner
+from real_estate_toolkit.data.descriptor import Descriptor, DescriptorNumpy
+from real_estate_toolkit.data.table import TableRows
+from real_estate_toolkit.agent_based_model.consumers import Segment
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.simulation import (
+    Simulation, AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism
+)
+
+TRAIN_CSV = ROOT / "src" / "files" / "train.csv"
+SCALES = (1, 10, 100, 1000)
+# A median slower than the baseline by more than this fraction is a regression...
+DEFAULT_THRESHOLD = 0.25
+# ...unless it is also less than this many seconds slower (timer noise of tiny cases)
+MIN_REGRESSION_SECONDS = 0.005
+
+
+class Dataset:
+    """Synthetic dataset of one scale, with the forms the cases read it in (built once)."""
+
+    def __init__(self, path: Path, scale: int, rows: int):
+        self.path = path
+        self.scale = scale
+        self.rows = rows
+        self._cache: Dict[str, Any] = {}
+
+    def _cached(self, name: str, build: Callable[[], Any]) -> Any:
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    def raw_rows(self) -> List[Dict[str, Any]]:
+        return self._cached("raw_rows", DataLoader(self.path).load_data_from_csv)
+
+    def clean_rows(self) -> List[Dict[str, Any]]:
+        def build():
+            cleaner = Cleaner([dict(row) for row in self.raw_rows()])
+            cleaner.rename_with_best_practices()
+            return cleaner.na_to_none()
+        return self._cached("clean_rows", build)
+
+    def clean_table(self) -> TableRows:
+        return self._cached("clean_table", lambda: DataLoader(self.path).load_table(clean=True))
+
+    def numeric_columns(self) -> List[str]:
+        row = self.clean_rows()[0]
+        return [key for key, value in row.items() if isinstance(value, (int, float))]
+
+
+def synthetic_dataset(scale: int, data_dir: Path, seed: int = 0) -> Dataset:
+    """train.csv resampled to scale * its rows (written once to data_dir)."""
+    path = data_dir / f"train_x{scale}.csv"
+    template = pl.read_csv(TRAIN_CSV, infer_schema_length=10000)
+    rows = len(template) * scale
+    if not path.exists():
+        generator = np.random.default_rng(seed)
+        frame = template[generator.integers(0, len(template), rows)]
+        noise = generator.lognormal(0, 0.05, (2, rows))
+        frame = frame.with_columns(
+            pl.Series("Id", np.arange(1, rows + 1)),
+            (pl.col("SalePrice") * noise[0]).round(0).cast(pl.Int64),
+            (pl.col("LotArea") * noise[1]).round(0).cast(pl.Int64),
+        )
+        data_dir.mkdir(parents=True, exist_ok=True)
+        frame.write_csv(path, null_value="NA")
+    return Dataset(path, scale, rows)
+
+
+@dataclass
+class Case:
+    """One benchmark: setup(dataset) does the untimed preparation of one run and returns
+    the function that is timed."""
+    name: str
+    setup: Callable[[Dataset], Callable[[], Any]]
+    # Largest scale the case runs at (list-of-dictionaries cases run out of memory above)
+    max_scale: int = max(SCALES)
+    threshold: float = DEFAULT_THRESHOLD
+
+
+def _cleaner_rows(dataset: Dataset) -> Callable[[], Any]:
+    cleaner = Cleaner([dict(row) for row in dataset.raw_rows()])
+
+    def run():
+        cleaner.rename_with_best_practices()
+        cleaner.na_to_none()
+    return run
+
+
+def _cleaner_table(dataset: Dataset) -> Callable[[], Any]:
+    table = DataLoader(dataset.path).load_table()
+
+    def run():
+        cleaner = Cleaner(table)
+        cleaner.rename_with_best_practices()
+        cleaner.na_to_none().frame
+    return run
+
+
+def _describe(descriptor_class) -> Callable[[Dataset], Callable[[], Any]]:
+    def setup(dataset: Dataset) -> Callable[[], Any]:
+        rows, columns = dataset.clean_rows(), dataset.numeric_columns()
+        return lambda: descriptor_class(rows).describe(columns, percentiles=[25, 75])
+    return setup
+
+
+def _market_queries(dataset: Dataset) -> Callable[[], Any]:
+    market = HousingMarket.from_table(dataset.clean_table())
+    generator = random.Random(0)
+    queries = [
+        (generator.uniform(50000, 400000), generator.choice(list(Segment)), generator.randint(1, 4))
+        for _ in range(1000)
+    ]
+
+    def run():
+        for max_price, segment, min_bedrooms in queries:
+            market.sell_cheapest_match(max_price, segment, min_bedrooms)
+        for max_price, segment, _ in queries[:20]:
+            market.query(max_price, segment)
+    return run
+
+
+def _simulation(agent_store: bool) -> Callable[[Dataset], Callable[[], Any]]:
+    def setup(dataset: Dataset) -> Callable[[], Any]:
+        data = dataset.clean_table() if agent_store else dataset.clean_rows()
+        simulation = Simulation(
+            housing_market_data=data if agent_store else [dict(row) for row in data],
+            consumers_number=dataset.rows,
+            years=5,
+            annual_income=AnnualIncomeStatistics(minimum=30000.0, average=60000.0, standard_deviation=20000.0, maximum=150000.0),
+            children_range=ChildrenRange(minimum=0, maximum=5),
+            cleaning_market_mechanism=CleaningMarketMechanism.INCOME_ORDER_DESCENDANT,
+            agent_store=agent_store,
+            seed=0,
+        )
+
+        def run():
+            simulation.create_housing_market()
+            simulation.create_consumers()
+            simulation.compute_consumers_savings()
+            simulation.clean_the_market()
+        return run
+    return setup
+
+
+def _market_analyzer(method: str) -> Callable[[Dataset], Callable[[], Any]]:
+    def setup(dataset: Dataset) -> Callable[[], Any]:
+        from real_estate_toolkit.Analytics.exploratory import MarketAnalyzer
+
+        # The figures are written under the working directory (a temporary one)
+        os.makedirs("real_estate_toolkit/analytics/outputs", exist_ok=True)
+        analyzer = MarketAnalyzer(str(dataset.path))
+        if method == "clean_data":
+            return analyzer.clean_data
+        analyzer.clean_data()
+        if method == "feature_correlation_heatmap":
+            return lambda: analyzer.feature_correlation_heatmap(["SalePrice", "GrLivArea", "YearBuilt", "OverallQual", "LotArea"])
+        return getattr(analyzer, method)
+    return setup
+
+
+CASES = [
+    Case("loader.load_data_from_csv", lambda dataset: DataLoader(dataset.path).load_data_from_csv, max_scale=100),
+    Case("loader.load_table", lambda dataset: lambda: DataLoader(dataset.path).load_table(clean=True)),
+    Case("cleaner.rows", _cleaner_rows, max_scale=100),
+    Case("cleaner.table", _cleaner_table),
+    Case("descriptor.describe", _describe(Descriptor), max_scale=100),
+    Case("descriptor_numpy.describe", _describe(DescriptorNumpy), max_scale=100),
+    Case("housing_market.from_table", lambda dataset: lambda: HousingMarket.from_table(dataset.clean_table())),
+    Case("housing_market.queries", _market_queries),
+    Case("simulation.objects", _simulation(agent_store=False), max_scale=100),
+    Case("simulation.agent_store", _simulation(agent_store=True)),
+    Case("market_analyzer.clean_data", _market_analyzer("clean_data")),
+    Case("market_analyzer.generate_price_distribution_analysis", _market_analyzer("generate_price_distribution_analysis"), max_scale=100),
+    Case("market_analyzer.neighborhood_price_comparison", _market_analyzer("neighborhood_price_comparison"), max_scale=100),
+    Case("market_analyzer.feature_correlation_heatmap", _market_analyzer("feature_correlation_heatmap"), max_scale=100),
+    Case("market_analyzer.create_scatter_plots", _market_analyzer("create_scatter_plots"), max_scale=100),
+]
+
+
+@dataclass
+class Result:
+    case: str
+    scale: int
+    rows: int
+    status: str  # "ok", "skipped" or "error"
+    repeats: int = 0
+    min_seconds: Optional[float] = None
+    median_seconds: Optional[float] = None
+    note: str = ""
+
+
+def measure(case: Case, dataset: Dataset, repeats: int) -> Result:
+    times = []
+    try:
+        for _ in range(repeats):
+            run = case.setup(dataset)
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    except ImportError as error:
+        # Optional dependencies (plotly, pandas, kaleido...) of some modules
+        return Result(case.name, dataset.scale, dataset.rows, "skipped", note=f"missing dependency: {error}")
+    except Exception as error:
+        return Result(case.name, dataset.scale, dataset.rows, "error", note=f"{type(error).__name__}: {error}")
+    return Result(case.name, dataset.scale, dataset.rows, "ok", len(times), min(times), statistics.median(times))
+
+
+def metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "polars": pl.__version__,
+    }
+
+
+def compare(results: List[Result], baseline_path: Path) -> List[str]:
+    """Regressions of results against a baseline results file (same case and scale)."""
+    baseline = {
+        (result["case"], result["scale"]): result
+        for result in json.loads(baseline_path.read_text())["results"] if result["status"] == "ok"
+    }
+    thresholds = {case.name: case.threshold for case in CASES}
+    regressions = []
+    print(f"\nCompared with {baseline_path}")
+    for result in results:
+        reference = baseline.get((result.case, result.scale))
+        if result.status != "ok" or reference is None:
+            continue
+        ratio = result.median_seconds / reference["median_seconds"]
+        threshold = thresholds.get(result.case, DEFAULT_THRESHOLD)
+        regressed = ratio > 1 + threshold and \
+            result.median_seconds - reference["median_seconds"] > MIN_REGRESSION_SECONDS
+        print(f"  {result.case:<56} {result.scale:>5}x {ratio:8.2f}x{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(f"{result.case} at {result.scale}x: {ratio:.2f}x the baseline "
+                               f"(threshold {1 + threshold:.2f}x)")
+    return regressions
+
+
+def run(scales: List[int], case_names: Optional[List[str]], repeats: int, data_dir: Path,
+        output: Path, baseline: Optional[Path], all_scales: bool) -> int:
+    cases = [case for case in CASES if not case_names or any(case.name.startswith(name) for name in case_names)]
+    results = []
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for scale in scales:
+                dataset = synthetic_dataset(scale, data_dir)
+                print(f"{scale}x: {dataset.rows:,} rows")
+                for case in cases:
+                    if scale > case.max_scale and not all_scales:
+                        result = Result(case.name, scale, dataset.rows, "skipped", note=f"above max scale {case.max_scale}x")
+                    else:
+                        result = measure(case, dataset, repeats)
+                    results.append(result)
+                    timing = f"{result.median_seconds:10.3f} s (min {result.min_seconds:.3f})" \
+                        if result.status == "ok" else f"{result.status}: {result.note}"
+                    print(f"  {case.name:<56} {timing}")
+        finally:
+            os.chdir(working_directory)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "metadata": {**metadata(), "repeats": repeats},
+        "thresholds": {case.name: case.threshold for case in cases},
+        "results": [asdict(result) for result in results],
+    }, indent=2))
+    print(f"Results written to {output}")
+
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help=f"dataset scales (of {SCALES})")
+    parser.add_argument("--cases", nargs="+", help="only the cases whose name starts with one of these")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per case and scale")
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "real_estate_toolkit_benchmarks",
+                        help="where the synthetic datasets are written")
+    parser.add_argument("--output", type=Path,
+                        default=ROOT / "benchmarks" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json",
+                        help="results file (JSON)")
+    parser.add_argument("--baseline", type=Path, help="results file to check for regressions against")
+    parser.add_argument("--all-scales", action="store_true", help="ignore the max scale of the cases")
+    arguments = parser.parse_args()
+    sys.exit(run(arguments.scales, arguments.cases, arguments.repeats, arguments.data_dir.resolve(),
+                 arguments.output.resolve(), arguments.baseline.resolve() if arguments.baseline else None,
+                 arguments.all_scales))
@@ -95,6 +95,15 @@ def test_descriptive_statistics(cleaned_data: List[Dict[str, Any]]):
     type_modes = descriptor.type_and_mode()
     type_modes_numpy = descriptor_numpy.type_and_mode()
     assert set(type_modes.keys()) == set(type_modes_numpy.keys()), "Both implementations should handle same columns"
+    # Test single pass summary
+    summary = descriptor.describe(numeric_columns, percentiles=[75])
+    summary_numpy = descriptor_numpy.describe(numeric_columns, percentiles=[75])
+    for col in numeric_columns:
+        assert summary[col].none_ratio == none_ratios[col], f"Summary none ratio differs for {col}"
+        assert summary[col].mean == averages[col], f"Summary average differs for {col}"
+        assert summary[col].median == medians[col], f"Summary median differs for {col}"
+        assert summary[col].percentiles[75] == percentiles[col], f"Summary percentile differs for {col}"
+        assert abs(summary[col].std - summary_numpy[col].std) < 1e-6, f"Standard deviation calculations differ for {col}"
     return numeric_columns
 
 def test_house_functionality():
@@ -1,18 +1,24 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import polars as pl
 import plotly.express as px
 import plotly.graph_objects as go
 
+from ..data.cache import DatasetCache
+
 
 class MarketAnalyzer:
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, cache: Optional[DatasetCache] = None):
         """
         Initialize the analyzer with data from a CSV file.
         
         Args:
             data_path (str): Path to the Ames Housing dataset
+            cache (DatasetCache): Optional cache, reuses the parsed table of previous runs
         """
-        self.real_state_data = pl.read_csv(data_path, infer_schema_length=10000)
+        if cache is not None:
+            self.real_state_data = cache.load(data_path).frame
+        else:
+            self.real_state_data = pl.read_csv(data_path, infer_schema_length=10000)
         self.real_state_clean_data = None
     
     def clean_data(self) -> None:
@@ -0,0 +1,18 @@
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+import tomllib
+
+
+def _source_version() -> str:
+    """Version in the pyproject.toml of a source checkout (the package is not installed)."""
+    pyproject = Path(__file__).resolve().parents[2] / "pyproject.toml"
+    try:
+        return tomllib.loads(pyproject.read_text())["tool"]["poetry"]["version"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError):
+        return "0+unknown"
+
+
+try:
+    __version__ = version("real-estate-toolkit")
+except PackageNotFoundError:
+    __version__ = _source_version()
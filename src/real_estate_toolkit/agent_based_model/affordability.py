@@ -0,0 +1,82 @@
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .consumers import Consumer
+from .savings import ArrayLike, compound_growth_minus_one
+from .store import ConsumerStore
+
+
+def mortgage_annuity_factor(interest_rate: ArrayLike, years: int, payments_per_year: int = 12) -> np.ndarray:
+    """Loan amount a payment of 1 per period repays over `years` at the annual interest_rate:
+
+        (1 - (1 + r)**-n) / r,  r = interest_rate / payments_per_year, n = years * payments_per_year
+
+    (n without interest).
+    """
+    rate = np.asarray(interest_rate, dtype=np.float64) / payments_per_year
+    payments = years * payments_per_year
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rate == 0, payments, -compound_growth_minus_one(rate, -payments) / rate)
+
+
+def max_affordable_prices(savings: ArrayLike, annual_income: ArrayLike, interest_rate: ArrayLike,
+                          down_payment_percentage: float = 0.2, debt_to_income_ratio: float = 0.36,
+                          mortgage_years: int = 30, payments_per_year: int = 12) -> np.ndarray:
+    """
+    Highest house price every consumer can pay: the savings go to the down payment, which
+    must be at least down_payment_percentage of the price, and the rest is a mortgage at
+    the consumer's interest_rate whose payments are at most debt_to_income_ratio of the
+    income. All arguments broadcast.
+    """
+    savings = np.asarray(savings, dtype=np.float64)
+    payment = np.asarray(annual_income, dtype=np.float64) * debt_to_income_ratio / payments_per_year
+    max_price = savings + payment * mortgage_annuity_factor(interest_rate, mortgage_years, payments_per_year)
+    if down_payment_percentage > 0:
+        max_price = np.minimum(max_price, savings / down_payment_percentage)
+    return np.maximum(max_price, 0)
+
+
+@dataclass
+class AffordabilityEngine:
+    """Maximum purchasable price of a whole population (see max_affordable_prices).
+
+    The prices are computed in one vectorized pass and cached with the savings, incomes and
+    interest rates they come from; later calls only recompute the consumers whose inputs
+    changed, and return the cached prices when none did (changing the terms recomputes all).
+    """
+    down_payment_percentage: float = 0.2
+    debt_to_income_ratio: float = 0.36
+    mortgage_years: int = 30
+    payments_per_year: int = 12
+    _terms: Optional[Tuple[float, float, int, int]] = field(default=None, init=False, repr=False)
+    _inputs: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = field(default=None, init=False, repr=False)
+    _max_prices: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+    def _compute(self, savings: np.ndarray, annual_income: np.ndarray, interest_rate: np.ndarray) -> np.ndarray:
+        return max_affordable_prices(savings, annual_income, interest_rate, self.down_payment_percentage,
+                                     self.debt_to_income_ratio, self.mortgage_years, self.payments_per_year)
+
+    def max_prices(self, consumers: Union[Sequence[Consumer], ConsumerStore]) -> np.ndarray:
+        """Maximum price of every consumer (by position). The array is the cache: do not change it."""
+        if isinstance(consumers, ConsumerStore):
+            inputs = (consumers.savings, consumers.annual_income, consumers.interest_rate)
+        else:
+            inputs = tuple(
+                np.array([getattr(consumer, name) for consumer in consumers], dtype=np.float64)
+                for name in ("savings", "annual_income", "interest_rate")
+            )
+
+        terms = (self.down_payment_percentage, self.debt_to_income_ratio, self.mortgage_years, self.payments_per_year)
+        if self._inputs is None or self._terms != terms or len(self._inputs[0]) != len(inputs[0]):
+            self._terms = terms
+            self._max_prices = self._compute(*inputs)
+        else:
+            changed = np.flatnonzero(np.logical_or.reduce([
+                new != cached for new, cached in zip(inputs, self._inputs)
+            ]))
+            if len(changed) == 0:
+                return self._max_prices
+            self._max_prices[changed] = self._compute(*(values[changed] for values in inputs))
+        self._inputs = tuple(np.array(values, dtype=np.float64) for values in inputs)
+        return self._max_prices
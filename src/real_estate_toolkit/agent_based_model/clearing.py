@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+import time
+
+from .affordability import AffordabilityEngine
+from .consumers import Consumer, Segment
+from .house_market import HousingMarket
+from .store import ConsumerStore
+
+
+@dataclass
+class ClearingReport:
+    """Outcome of one market clearing."""
+    consumers: int
+    matches: int
+    seconds: float
+
+    @property
+    def unmatched(self) -> int:
+        return self.consumers - self.matches
+
+    @property
+    def matches_per_second(self) -> float:
+        return self.matches / self.seconds if self.seconds > 0 else float("inf")
+
+
+@dataclass
+class ClearingEngine:
+    """Clears a housing market for a queue of consumers.
+
+    Every consumer without a house gets the cheapest available house of their segment
+    that they can pay and that has a bedroom per child plus one. What a consumer can pay
+    is their savings, or the mortgage-backed maximum price of the affordability engine,
+    computed for the whole queue before the clearing starts.
+    The house is sold as it is matched, so no house goes to two consumers, and consumers
+    who cannot buy are skipped instead of stopping the clearing.
+    """
+    housing_market: HousingMarket
+    affordability: Optional[AffordabilityEngine] = None
+
+    def clear(self, consumers: Union[Sequence[Consumer], ConsumerStore],
+              order: Optional[Sequence[int]] = None) -> ClearingReport:
+        """Match the consumers, visited in `order` (positions in consumers, default as given)."""
+        if order is None:
+            order = range(len(consumers))
+        start = time.perf_counter()
+        if isinstance(consumers, ConsumerStore):
+            matches = self._clear_store(consumers, order)
+        else:
+            max_prices = self._max_prices(consumers)
+            matches = 0
+            for position in order:
+                consumer = consumers[position]
+                if consumer.house is None and self._buy(consumer, max_prices[position], consumer.segment, consumer.children_number):
+                    matches += 1
+        return ClearingReport(len(order), matches, time.perf_counter() - start)
+
+    def _max_prices(self, consumers: Union[Sequence[Consumer], ConsumerStore]) -> List[float]:
+        """Price bound of every consumer (by position)."""
+        if self.affordability is not None:
+            return self.affordability.max_prices(consumers).tolist()
+        if isinstance(consumers, ConsumerStore):
+            return consumers.savings.tolist()
+        return [consumer.savings for consumer in consumers]
+
+    def _buy(self, consumer: Consumer, max_price: float, segment: Segment, children_number: int) -> bool:
+        house = self.housing_market.sell_cheapest_match(max_price, segment, children_number + 1)
+        if house is None:
+            return False
+        consumer.house = house
+        return True
+
+    def _clear_store(self, consumers: ConsumerStore, order: Sequence[int]) -> int:
+        """Same matching reading the store columns once instead of through views."""
+        market = self.housing_market
+        # Every house is a view of the store when the market was built on it (and only views
+        # of it were listed since, which keeps the lengths equal)
+        if market.house_store is None or market.house_store is not consumers.houses \
+                or len(market.houses) != len(consumers.houses):
+            raise ValueError("The housing market of a ConsumerStore must be built on its HouseStore.")
+        max_prices = self._max_prices(consumers)
+        segments = [Segment(code) for code in consumers.segment.tolist()]
+        children = consumers.children_number.tolist()
+        owned = consumers.house
+        matches = 0
+        for position in order:
+            if owned[position] >= 0:
+                continue
+            house = self.housing_market.sell_cheapest_match(max_prices[position], segments[position], children[position] + 1)
+            if house is None:
+                continue
+            owned[position] = house._index
+            matches += 1
+        return matches
@@ -39,7 +39,7 @@ class Consumer:
         self.savings = round(total_savings, 2)
 
 
-    def buy_a_house(self, housing_market: HousingMarket) -> None:
+    def buy_a_house(self, housing_market: HousingMarket, max_price: Optional[float] = None) -> None:
         """
         Attempt to purchase a suitable house.
         
@@ -49,14 +49,13 @@ class Consumer:
         - Match house to family size needs
         - Apply segment-specific preferences
         """
-        #Assuming max price is equal to savings
-        available_houses = housing_market.get_houses_that_meet_requirements(self.savings, self.segment)
+        #max_price is what the consumer can pay (e.g. from an AffordabilityEngine), the savings by default
+        #Cheapest house of the segment with a bedroom per child plus one, sold right away so nobody else gets it
+        if max_price is None:
+            max_price = self.savings
+        house = housing_market.sell_cheapest_match(max_price, self.segment, min_bedrooms=self.children_number + 1)
 
-        suitable_houses = [house for house in available_houses if house.bedrooms >= self.children_number + 1]
-
-        if not suitable_houses:
+        if house is None:
             return None
         
-        self.house = suitable_houses[0]
-
-
+        self.house = house
@@ -1,72 +1,726 @@
-from typing import List, Optional
-from .houses import House, QualityScore
-from numpy import mean
+from heapq import merge
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .houses import House, QualityScore, REFERENCE_YEAR
+from .quality import derived_quality_scores, new_construction, overall_qual_codes, score_houses
+
+# set_prices moves up to this many houses of a price index one by one; more, and the index is sorted again
+_MAX_MOVES = 32
+
+
+class _PriceIndex:
+    """Houses of one bucket sorted by (price, id), as parallel arrays of prices, ids and
+    market positions.
+
+    Every house of the bucket is in the index, available or not: selling a house only
+    changes the availability column of the market, which the lookups take as argument.
+    The entries before `head` are known to be sold, so the cheapest available house is
+    found in amortized constant time. Price changes move entries (or sort them again).
+    `scanned` counts the entries the lookups have read, sold ones included.
+    """
+
+    def __init__(self, prices: np.ndarray, ids: np.ndarray, positions: np.ndarray):
+        self.prices = prices
+        self.ids = ids
+        self.positions = positions
+        self.head = 0
+        self.scanned = 0
+
+    def sort(self, rows: np.ndarray, prices: np.ndarray, ids: np.ndarray) -> None:
+        """Index the houses at market positions rows again, from the price and id columns."""
+        rows = rows[np.lexsort((ids[rows], prices[rows]))]
+        self.prices, self.ids, self.positions, self.head = prices[rows], ids[rows], rows, 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _rank(self, price: float, house_id: int) -> int:
+        """Where the entry (price, house_id) is, or would be inserted."""
+        low = int(np.searchsorted(self.prices, price, "left"))
+        high = int(np.searchsorted(self.prices, price, "right"))
+        return low + int(np.searchsorted(self.ids[low:high], house_id))
+
+    def insert(self, price: float, house_id: int, position: int) -> None:
+        rank = self._rank(price, house_id)
+        self.prices = np.insert(self.prices, rank, price)
+        self.ids = np.insert(self.ids, rank, house_id)
+        self.positions = np.insert(self.positions, rank, position)
+        self.head = min(self.head, rank)
+
+    def remove(self, price: float, house_id: int) -> None:
+        rank = self._rank(price, house_id)
+        self.prices = np.delete(self.prices, rank)
+        self.ids = np.delete(self.ids, rank)
+        self.positions = np.delete(self.positions, rank)
+        if rank < self.head:
+            self.head -= 1
+
+    def reopen(self, price: float, house_id: int) -> None:
+        """A house of the index is available again."""
+        self.head = min(self.head, self._rank(price, house_id))
+
+    def cheapest(self, available: np.ndarray, max_price: float, inclusive: bool = True) -> Optional[Tuple[float, int, int]]:
+        """(price, id, position) of the cheapest available house with price <= max_price
+        (< max_price if not inclusive), or None."""
+        positions, head, size = self.positions, self.head, len(self.positions)
+        while head < size and not available[positions[head]]:
+            head += 1
+        self.scanned += head - self.head + (head < size)
+        self.head = head
+        if head == size:
+            return None
+        price = float(self.prices[head])
+        if price < max_price or (inclusive and price == max_price):
+            return price, int(self.ids[head]), int(positions[head])
+        return None
+
+    def up_to(self, available: np.ndarray, max_price: float, inclusive: bool = True) -> Iterator[Tuple[float, int, int]]:
+        """(price, id, position) of the available houses with price <= max_price (< max_price
+        if not inclusive), cheapest first. Read in growing chunks, so a short walk stays short;
+        the head moves past the sold houses read before the first available one."""
+        end = int(np.searchsorted(self.prices, max_price, "right" if inclusive else "left"))
+        start, chunk = self.head, 16
+        while start < end:
+            stop = min(start + chunk, end)
+            rows = self.positions[start:stop]
+            self.scanned += stop - start
+            kept = available[rows]
+            if start == self.head:
+                self.head = start + (int(kept.argmax()) if kept.any() else stop - start)
+            yield from zip(self.prices[start:stop][kept].tolist(), self.ids[start:stop][kept].tolist(), rows[kept].tolist())
+            start, chunk = stop, chunk * 2
+
 
 class HousingMarket:
-    def __init__(self, houses: List[House]):
-        self.houses: List[House] = houses
-    
+    """Collection of houses with indexes for fast lookups.
+
+    Houses are looked up by id in a sorted id column, and kept sorted by price in one
+    index per (segment eligibility, bedrooms) bucket. The total price and count of the
+    available houses, overall and per bedrooms, are kept as running sums, so average prices
+    are O(1). Selling a house (House.sell_house or HousingMarket.sell_house) updates all of
+    them. Quality scores (derived for houses without one) and new construction flags
+    relative to reference_year are computed for the whole inventory in one pass when houses
+    are listed, and kept for the segment filters.
+
+    The inventory is also kept as columns by market position (price, area, bedrooms,
+    quality, availability, FANCY eligibility and price per square foot), refreshed only for
+    the houses whose price or availability changes, so segment filters are mask operations.
+    Sales and failed buy attempts are recorded per period for repricing (see reprice).
+    """
+    ALL = "all"
+    FANCY = "fancy"
+
+    def __init__(self, houses: List[House], reference_year: int = REFERENCE_YEAR):
+        quality, new = score_houses(houses, reference_year)
+        self._setup(
+            houses,
+            reference_year,
+            ids=[house.id for house in houses],
+            prices=[house.price for house in houses],
+            bedrooms=[house.bedrooms for house in houses],
+            areas=[house.area for house in houses],
+            available=np.array([house.available for house in houses], dtype=bool),
+            quality=quality,
+            fancy=new & (quality == QualityScore.EXCELLENT.value),
+        )
+
+    def _setup(self, houses: Sequence[House], reference_year: int, ids: Sequence[int], prices: Sequence[float],
+               bedrooms: Sequence[int], areas: Sequence[float], available: np.ndarray, quality: np.ndarray,
+               fancy: np.ndarray, house_store=None) -> None:
+        """Build every index in bulk from the columns: one sort for all the price indexes."""
+        self.houses = houses
+        self.reference_year = reference_year
+        self.house_store = house_store
+        # Profiler counting queries, houses scanned, index hits and purchases (None: off)
+        self.profiler = None
+        if house_store is not None:
+            # The views of a store share their market
+            house_store.market = self
+        else:
+            for house in houses:
+                house._market = self
+
+        self._ids = np.asarray(ids, dtype=np.int64)
+        self._prices = np.array(prices, dtype=np.float64)
+        self._areas = np.asarray(areas, dtype=np.float64)
+        self._bedrooms = np.asarray(bedrooms, dtype=np.int64)
+        self._available = np.array(available, dtype=bool)
+        self._quality = np.array(quality, dtype=np.int8)
+        self._fancy = np.array(fancy, dtype=bool)
+        self._price_per_sqft = _price_per_square_foot(self._prices, self._areas)
+        # Ids in ascending order and the market position of each
+        self._id_order = np.argsort(self._ids, kind="stable")
+        self._sorted_ids = self._ids[self._id_order]
+        self._price_index: Dict[Tuple[str, int], _PriceIndex] = {}
+        for name, rows in ((self.ALL, np.arange(len(self._ids))), (self.FANCY, np.flatnonzero(self._fancy))):
+            rows = rows[np.lexsort((self._ids[rows], self._prices[rows], self._bedrooms[rows]))]
+            bucket_bedrooms = self._bedrooms[rows]
+            starts = np.flatnonzero(np.r_[True, bucket_bedrooms[1:] != bucket_bedrooms[:-1]]) if len(rows) else []
+            for start, end in zip(list(starts), list(starts[1:]) + [len(rows)]):
+                bucket_rows = rows[start:end]
+                self._price_index[(name, int(bucket_bedrooms[start]))] = _PriceIndex(
+                    self._prices[bucket_rows], self._ids[bucket_rows], bucket_rows
+                )
+        self._group_indexes()
+        self._count_available()
+        self.start_period()
+
+    def _group_indexes(self) -> None:
+        """The price indexes a limit query walks, by (ALL or FANCY, min bedrooms), for every
+        min bedrooms from the fewest to the most bedrooms of the market."""
+        bedrooms = sorted({bucket for _, bucket in self._price_index})
+        self._fewest_bedrooms = min(bedrooms[0], 0) if bedrooms else 0
+        self._query_indexes: Dict[Tuple[str, int], List[_PriceIndex]] = {
+            (name, min_bedrooms): [
+                self._price_index[(name, bucket)] for bucket in bedrooms
+                if bucket >= min_bedrooms and (name, bucket) in self._price_index
+            ]
+            for name in (self.ALL, self.FANCY)
+            for min_bedrooms in range(self._fewest_bedrooms, bedrooms[-1] + 1 if bedrooms else 0)
+        }
+
+    def _count_available(self) -> None:
+        """Running sums of the prices of the available houses, from the columns."""
+        prices, bedrooms = self._prices[self._available], self._bedrooms[self._available]
+        self._total_price: float = float(prices.sum())
+        self._available_count: int = len(prices)
+        totals, counts = np.bincount(bedrooms, weights=prices), np.bincount(bedrooms)
+        # bedrooms -> [total price, count]
+        self._bedroom_totals: Dict[int, List[float]] = {
+            bucket: [float(totals[bucket]), int(counts[bucket])] for bucket in np.flatnonzero(counts).tolist()
+        }
+
+    @classmethod
+    def from_table(cls, table: Any, reference_year: int = REFERENCE_YEAR,
+                   columns: Optional[Dict[str, str]] = None) -> "HousingMarket":
+        """
+        Build a market straight from a table: a polars DataFrame or LazyFrame, a TableRows or
+        LazyTable from DataLoader, a pyarrow Table or a NumPy record array.
+
+        Only the needed columns are read (columns maps House attributes to table columns,
+        HOUSE_DATA_COLUMNS by default; CamelCase names of a raw CSV are accepted too). They
+        are validated once from the schema and cast in bulk into a HouseStore, whose
+        House views make up the market (available as house_store).
+        """
+        from .store import HouseStore, HOUSE_DATA_COLUMNS
+
+        frame = _house_columns(table, columns or HOUSE_DATA_COLUMNS)
+        quality = overall_qual_codes(frame["quality"].fill_null(0).to_numpy())
+        quality[frame["quality"].is_null().to_numpy()] = 0  # derived by from_store
+        store = HouseStore.from_columns(
+            id=frame["id"].to_numpy(),
+            price=frame["price"].to_numpy(),
+            area=frame["area"].to_numpy(),
+            bedrooms=frame["bedrooms"].to_numpy(),
+            year_built=frame["year_built"].to_numpy(),
+            quality=quality,
+        )
+        return cls.from_store(store, reference_year)
+
+    @classmethod
+    def from_store(cls, store, reference_year: int = REFERENCE_YEAR) -> "HousingMarket":
+        """
+        Market on the House views of a HouseStore (created on access), with the indexes built
+        from its arrays. Missing quality scores (0) are derived in the store, as score_houses does.
+        """
+        missing = store.quality == 0
+        if missing.any():
+            store.quality[missing] = derived_quality_scores(
+                store.year_built[missing], store.area[missing], store.bedrooms[missing], reference_year
+            )
+        market = cls.__new__(cls)
+        fancy = new_construction(store.year_built, reference_year) & (store.quality == QualityScore.EXCELLENT.value)
+        market._setup(
+            store.views(),
+            reference_year,
+            ids=store.id,
+            prices=store.price,
+            bedrooms=store.bedrooms,
+            areas=store.area,
+            available=store.available,
+            quality=store.quality,
+            fancy=fancy,
+            house_store=store,
+        )
+        return market
+
+    def _append_columns(self, houses: List[House]) -> None:
+        """Add the columns of new houses, with FANCY eligibility (new construction with an
+        EXCELLENT quality score)."""
+        quality, new = score_houses(houses, self.reference_year)
+        ids = np.array([house.id for house in houses], dtype=np.int64)
+        prices = np.array([house.price for house in houses], dtype=np.float64)
+        areas = np.array([house.area for house in houses], dtype=np.float64)
+        # Merged into the sorted ids
+        order = np.argsort(ids, kind="stable")
+        ranks = np.searchsorted(self._sorted_ids, ids[order])
+        self._sorted_ids = np.insert(self._sorted_ids, ranks, ids[order])
+        self._id_order = np.insert(self._id_order, ranks, len(self._ids) + order)
+        self._ids = np.concatenate([self._ids, ids])
+        self._prices = np.concatenate([self._prices, prices])
+        self._areas = np.concatenate([self._areas, areas])
+        self._bedrooms = np.concatenate([self._bedrooms, np.array([house.bedrooms for house in houses], dtype=np.int64)])
+        # Set by _index as the houses are indexed
+        self._available = np.concatenate([self._available, np.zeros(len(houses), dtype=bool)])
+        self._quality = np.concatenate([self._quality, quality])
+        self._fancy = np.concatenate([self._fancy, new & (quality == QualityScore.EXCELLENT.value)])
+        self._price_per_sqft = np.concatenate([self._price_per_sqft, _price_per_square_foot(prices, areas)])
+
+    def _position_of(self, house_id: int) -> Optional[int]:
+        """Market position of the house with house_id (None if it is not on the market)."""
+        try:
+            rank = int(np.searchsorted(self._sorted_ids, house_id))
+        except (TypeError, ValueError):
+            return None
+        if rank == len(self._sorted_ids) or self._sorted_ids[rank] != house_id:
+            return None
+        return int(self._id_order[rank])
+
+    def _house_position(self, house: House) -> int:
+        if self.house_store is not None and getattr(house, "_store", None) is self.house_store:
+            # A view knows its row
+            return house._index
+        return self._position_of(house.id)
+
+    def _set_price(self, position: int, house: House, price: float) -> None:
+        """Change the price of a house, its price columns and its place in the price indexes
+        (not the running sums)."""
+        old_price = float(self._prices[position])
+        house.price = price
+        self._prices[position] = price
+        price, area = float(price), float(self._areas[position])
+        self._price_per_sqft[position] = round(price / area, 2) if price > 0 and area > 0 else np.nan
+        house_id = int(self._ids[position])
+        for bucket in self._buckets(position):
+            index = self._price_index[bucket]
+            index.remove(old_price, house_id)
+            index.insert(price, house_id, position)
+
+    def _buckets(self, position: int) -> List[Tuple[str, int]]:
+        bedrooms = int(self._bedrooms[position])
+        if self._fancy[position]:
+            return [(self.ALL, bedrooms), (self.FANCY, bedrooms)]
+        return [(self.ALL, bedrooms)]
+
+    def _index(self, position: int) -> None:
+        """Make the house at a market position available in the price indexes and running sums."""
+        price, house_id = float(self._prices[position]), int(self._ids[position])
+        for bucket in self._buckets(position):
+            self._price_index[bucket].reopen(price, house_id)
+        self._available[position] = True
+        self._total_price += price
+        self._available_count += 1
+        totals = self._bedroom_totals.setdefault(int(self._bedrooms[position]), [0, 0])
+        totals[0] += price
+        totals[1] += 1
+
+    def _unindex(self, position: int) -> None:
+        """Take the house at a market position out of the available houses and running sums
+        (the price indexes skip it from now on)."""
+        price = float(self._prices[position])
+        self._available[position] = False
+        self._total_price -= price
+        self._available_count -= 1
+        totals = self._bedroom_totals[int(self._bedrooms[position])]
+        totals[0] -= price
+        totals[1] -= 1
+
+    def _on_house_sold(self, house: House) -> None:
+        """Called by House.sell_house to keep the indexes consistent."""
+        self._unindex(self._house_position(house))
+
     def get_house_by_id(self, house_id: int) -> House:
         """
         Retrieve specific house by ID.
-        
+
         Implementation tips:
         - Use efficient search method
         - Handle non-existent IDs
         """
-        for house in self.houses:
-            if house.id == house_id:
-                return house
-        
-        raise Exception(f"No house found with ID {house_id}.")
+        position = self._position_of(house_id)
+        if position is None:
+            raise Exception(f"No house found with ID {house_id}.")
+        return self.houses[position]
+
+    def sell_house(self, house_id: int) -> House:
+        """Mark a house as sold and remove it from the availability indexes."""
+        house = self.get_house_by_id(house_id)
+        house.sell_house()
+        return house
+
+    def add_houses(self, houses: List[House]) -> None:
+        """List new houses on the market; only they are added to the indexes."""
+        ids = [house.id for house in houses]
+        for house_id in ids:
+            if self._position_of(house_id) is not None:
+                raise Exception(f"A house with ID {house_id} is already on the market.")
+        if len(set(ids)) != len(ids):
+            raise Exception("The new houses have repeated IDs.")
+        start, new_buckets = len(self.houses), False
+        self._append_columns(houses)
+        for position, house in enumerate(houses, start):
+            self.houses.append(house)
+            house._market = self
+            for bucket in self._buckets(position):
+                if bucket not in self._price_index:
+                    self._price_index[bucket] = _PriceIndex(np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+                    new_buckets = True
+                self._price_index[bucket].insert(float(self._prices[position]), int(self._ids[position]), position)
+            if house.available:
+                self._index(position)
+        if new_buckets:
+            self._group_indexes()
+        # Houses listed during a period are part of its supply
+        self._period_available = np.concatenate([self._period_available, self._available[start:]])
+
+    def update_price(self, house_id: int, price: float) -> House:
+        """Change the price of a house, moving it in the price indexes and running sums."""
+        house = self.get_house_by_id(house_id)
+        position = self._position_of(house_id)
+        if house.available:
+            self._unindex(position)
+        self._set_price(position, house, price)
+        if house.available:
+            self._index(position)
+        return house
+
+    def snapshot(self) -> List[Tuple[float, bool]]:
+        """Price and availability of every house, to restore the market later."""
+        return list(zip(self._prices.tolist(), self._available.tolist()))
+
+    def restore(self, snapshot: List[Tuple[float, bool]]) -> None:
+        """
+        Return the houses of the market to a snapshot (e.g. before a new simulation run on
+        the same market). Only the houses that changed since are updated, in bulk.
+        """
+        if len(snapshot) != len(self.houses):
+            raise Exception("The snapshot does not belong to this market (different number of houses).")
+        prices = np.array([price for price, _ in snapshot], dtype=np.float64)
+        available = np.array([available for _, available in snapshot], dtype=bool)
+        repriced = np.flatnonzero(prices != self._prices)
+        self.set_prices(repriced, prices[repriced])
+        changed = np.flatnonzero(available != self._available)
+        if len(changed):
+            if self.house_store is not None and len(self.house_store) == len(self.houses):
+                self.house_store.available[changed] = available[changed]
+            else:
+                for house, house_available in zip(_pick(self.houses, changed.tolist()), available[changed].tolist()):
+                    house.available = house_available
+            self._available[changed] = available[changed]
+            for index in self._price_index.values():
+                # Houses available again may be anywhere in the index
+                index.head = 0
+            self._count_available()
+        self.start_period()
 
     def calculate_average_price(self, bedrooms: Optional[int] = None) -> float:
         """
         Calculate average house price, optionally filtered by bedrooms.
-        
+
         Implementation tips:
         - Handle empty lists
         - Consider using statistics module
         - Implement bedroom filtering efficiently
         """
         if bedrooms is not None:
-            filtered_houses = [house.price for house in self.houses if house.bedrooms == bedrooms and house.available]
+            total_price, count = self._bedroom_totals.get(bedrooms, (0, 0))
         else:
-            filtered_houses = [house.price for house in self.houses if house.available]
-        
-        if not filtered_houses:
+            total_price, count = self._total_price, self._available_count
+
+        if count == 0:
             raise Exception("No houses match the criteria for calculating the average price.")
-        
-        return mean(filtered_houses)
-    
+
+        return total_price / count
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The inventory columns, by market position (read them, do not change them)."""
+        return {
+            "id": self._ids,
+            "price": self._prices,
+            "area": self._areas,
+            "bedrooms": self._bedrooms,
+            "quality": self._quality,
+            "available": self._available,
+            "fancy": self._fancy,
+            "price_per_square_foot": self._price_per_sqft,
+        }
+
+    def start_period(self) -> None:
+        """Start recording the demand of a new period (see period_demand)."""
+        self._period_available = self._available.copy()
+        self._unmet_demand: Dict[Tuple[int, Any], int] = {}  # (min bedrooms, segment) -> attempts
+
+    def _record_unmet_demand(self, segment, min_bedrooms: int) -> None:
+        key = (min_bedrooms, segment)
+        self._unmet_demand[key] = self._unmet_demand.get(key, 0) + 1
+
+    def period_demand(self) -> Tuple[np.ndarray, np.ndarray, Dict[Tuple[int, Any], int]]:
+        """
+        Demand since start_period: the houses available when the period started and the
+        houses sold since (masks by market position), and the buy attempts that found no
+        house, counted by (min bedrooms, segment).
+        """
+        return self._period_available, self._period_available & ~self._available, dict(self._unmet_demand)
+
+    def set_prices(self, positions: Sequence[int], prices: Sequence[float]) -> None:
+        """
+        Change the prices of the houses at many market positions at once.
+
+        The price columns and running sums are updated in bulk. A price index with few
+        changed houses moves them one by one; one where many changed is sorted again.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(positions) == 0:
+            return
+        old_prices = self._prices[positions]
+        self._prices[positions] = prices
+        self._price_per_sqft[positions] = _price_per_square_foot(prices, self._areas[positions])
+        if self.house_store is not None and len(self.house_store) == len(self.houses):
+            # The houses are the views of the store rows
+            self.house_store.price[positions] = prices
+        else:
+            for house, price in zip(_pick(self.houses, positions.tolist()), prices.tolist()):
+                house.price = price
+
+        # Every house is in its price indexes, sold or not
+        bedrooms = self._bedrooms[positions]
+        fancy = self._fancy[positions]
+        for name, counts in ((self.ALL, np.bincount(bedrooms)), (self.FANCY, np.bincount(bedrooms[fancy]))):
+            for bucket in np.flatnonzero(counts).tolist():
+                index = self._price_index[(name, bucket)]
+                if counts[bucket] <= _MAX_MOVES:
+                    changed = bedrooms == bucket
+                    if name == self.FANCY:
+                        changed &= fancy
+                    moves = zip(self._ids[positions[changed]].tolist(), positions[changed].tolist(),
+                                old_prices[changed].tolist(), prices[changed].tolist())
+                    for house_id, position, old_price, price in moves:
+                        index.remove(old_price, house_id)
+                        index.insert(price, house_id, position)
+                else:
+                    rows = self._bedrooms == bucket
+                    if name == self.FANCY:
+                        rows &= self._fancy
+                    index.sort(np.flatnonzero(rows), self._prices, self._ids)
+
+        listed = self._available[positions]
+        change = prices[listed] - old_prices[listed]
+        self._total_price += float(change.sum())
+        changes = np.bincount(bedrooms[listed], weights=change)
+        for bucket in np.flatnonzero(changes).tolist():
+            self._bedroom_totals[bucket][0] += float(changes[bucket])
+
+    def reprice(self, dynamics) -> int:
+        """
+        Repricing stage: set the prices dynamics.prices(self) computes from the demand of
+        the period, then start a new period. Returns the number of houses repriced.
+        """
+        prices = dynamics.prices(self)
+        changed = np.flatnonzero(prices != self._prices)
+        self.set_prices(changed, prices[changed])
+        self.start_period()
+        return len(changed)
+
+    def _price_bound(self, max_price: float, below_average: bool) -> Optional[Tuple[float, bool]]:
+        """Price bound of a query and whether it is inclusive (None when nothing can match).
+        below_average is for the AVERAGE segment."""
+        if self._available_count == 0:
+            return None
+        if below_average:
+            # Below the average price of the available houses
+            average_price = self.calculate_average_price()
+            if average_price <= max_price:
+                return average_price, False
+        return max_price, True
+
+    def segment_mask(self, max_price: float, segment=None, min_bedrooms: int = 0) -> np.ndarray:
+        """
+        Boolean mask over the market houses (in market order) of the available houses under
+        max_price for a segment with at least min_bedrooms bedrooms.
+
+        OPTIMIZER keeps the houses whose price per square foot is at most max_price / area;
+        houses without a valid price per square foot (area or price <= 0) never match.
+        """
+        from .consumers import Segment
+
+        if self.profiler is not None:
+            self.profiler.count("houses_scanned", len(self.houses))
+        bound = self._price_bound(max_price, segment == Segment.AVERAGE)
+        if bound is None:
+            return np.zeros(len(self.houses), dtype=bool)
+        bound_price, inclusive = bound
+        mask = self._available & (self._prices <= bound_price if inclusive else self._prices < bound_price)
+        if min_bedrooms:
+            mask &= self._bedrooms >= min_bedrooms
+        if segment == Segment.FANCY:
+            mask &= self._fancy
+        elif segment == Segment.OPTIMIZER:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mask &= self._price_per_sqft <= max_price / self._areas
+        return mask
+
+    def query(self, max_price: float, segment=None, min_bedrooms: int = 0,
+              limit: Optional[int] = None) -> List[House]:
+        """
+        Available houses under max_price for a segment with at least min_bedrooms bedrooms,
+        cheapest first (then by id). With a limit, the sorted price index of every bedroom
+        bucket is walked until enough houses match; without one, the matches are taken from
+        segment_mask and sorted. The profiler counts the index entries read (sold houses
+        skipped included) as houses_scanned.
+        """
+        from .consumers import Segment
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.count("queries")
+        if self._available_count == 0:
+            return []
+        if limit is None:
+            rows = np.flatnonzero(self.segment_mask(max_price, segment, min_bedrooms))
+            rows = rows[np.lexsort((self._ids[rows], self._prices[rows]))]
+            return _pick(self.houses, rows.tolist()) if len(rows) else []
+
+        bound = self._price_bound(max_price, segment == Segment.AVERAGE)
+        if bound is None:
+            return []
+        bound_price, inclusive = bound
+        bucket_name = self.FANCY if segment == Segment.FANCY else self.ALL
+        # None past the most bedrooms of the market
+        indexes = self._query_indexes.get((bucket_name, max(min_bedrooms, self._fewest_bedrooms)), [])
+        available = self._available
+        if profiler is not None:
+            scanned = sum(index.scanned for index in indexes)
+        if segment == Segment.OPTIMIZER:
+            # price / area <= max_price / area is price <= max_price, but for the rounding of
+            # the price per square foot (and houses without one), checked on the column
+            def matches_segment(position: int) -> bool:
+                return self._price_per_sqft[position] <= max_price / self._areas[position]
+        else:
+            matches_segment = None
+
+        if limit == 1:
+            # Only the cheapest house: the minimum of the first available match of every bucket
+            cheapest = min(filter(None, (
+                _first_match(index, available, bound_price, inclusive, matches_segment) for index in indexes
+            )), default=None)
+            if profiler is not None:
+                profiler.count("houses_scanned", sum(index.scanned for index in indexes) - scanned)
+                profiler.count("index_hits", cheapest is not None)
+            return [] if cheapest is None else [self.houses[cheapest[2]]]
+
+        keys = merge(*(index.up_to(available, bound_price, inclusive) for index in indexes))
+        positions = (position for _, _, position in keys)
+        if matches_segment is not None:
+            positions = filter(matches_segment, positions)
+        matches = [self.houses[position] for position in islice(positions, limit)]
+        if profiler is not None:
+            profiler.count("houses_scanned", sum(index.scanned for index in indexes) - scanned)
+            profiler.count("index_hits", bool(matches))
+        return matches
+
+    def sell_cheapest_match(self, max_price: float, segment=None, min_bedrooms: int = 0) -> Optional[House]:
+        """Find the cheapest house that query would return and sell it in the same step.
+        Returns None (and sells nothing) when no house matches."""
+        matches = self.query(max_price, segment, min_bedrooms, limit=1)
+        if not matches:
+            self._record_unmet_demand(segment, min_bedrooms)
+            if self.profiler is not None:
+                self.profiler.count("failed_purchases")
+            return None
+        house = matches[0]
+        house.sell_house()
+        if self.profiler is not None:
+            self.profiler.count("matches")
+        return house
+
     def get_houses_that_meet_requirements(self, max_price: int, segment: str) -> Optional[List[House]]:
         """
         Filter houses based on buyer requirements.
-        
+
         Implementation tips:
         - Consider multiple filtering criteria
         - Implement efficient filtering
         - Handle case when no houses match
         """
         from .consumers import Segment
-        matching_houses = []
-
-        for house in self.houses:
-            if not house.available or house.price > max_price:
-                continue
-            
-            if segment == Segment.FANCY:
-                if house.is_new_construction() and house.quality_score == QualityScore.EXCELLENT:
-                    matching_houses.append(house)
-            elif segment == Segment.OPTIMIZER:
-                price_per_sqft = house.calculate_price_per_square_foot()
-                if price_per_sqft <= max_price / house.area:
-                    matching_houses.append(house)
-            elif segment == Segment.AVERAGE:
-                if house.price < self.calculate_average_price():
-                    matching_houses.append(house)
-
-        if len(matching_houses) == 0:
+
+        if self.profiler is not None:
+            self.profiler.count("queries")
+        # Only the three segments have requirements: anything else matches no house
+        if segment in (Segment.FANCY, Segment.OPTIMIZER, Segment.AVERAGE):
+            rows = np.flatnonzero(self.segment_mask(max_price, segment))
+        else:
+            rows = []
+
+        if len(rows) == 0:
             raise Exception(f"No houses found that meet the requirements for segment {segment} with max price {max_price}.")
 
-        return matching_houses
\ No newline at end of file
+        # Same order as the market list
+        return _pick(self.houses, rows.tolist())
+
+
+def _first_match(index: _PriceIndex, available: np.ndarray, max_price: float, inclusive: bool,
+                 matches_segment: Optional[Callable[[int], bool]]) -> Optional[Tuple[float, int, int]]:
+    """The cheapest available house of a price index under the bound that also passes
+    matches_segment (by market position), or None."""
+    cheapest = index.cheapest(available, max_price, inclusive)
+    if cheapest is None or matches_segment is None or matches_segment(cheapest[2]):
+        return cheapest
+    return next((key for key in index.up_to(available, max_price, inclusive) if matches_segment(key[2])), None)
+
+
+def _price_per_square_foot(prices: np.ndarray, areas: np.ndarray) -> np.ndarray:
+    """House.calculate_price_per_square_foot for many houses, NaN where it would raise."""
+    from .savings import round_like_python
+
+    valid = (prices > 0) & (areas > 0)
+    price_per_square_foot = np.full(len(prices), np.nan)
+    price_per_square_foot[valid] = round_like_python(prices[valid] / areas[valid], 2)
+    return price_per_square_foot
+
+
+def _pick(values: Sequence[Any], rows: List[int]) -> List[Any]:
+    """values[row] for every row, in one C call."""
+    if len(rows) == 1:
+        return [values[rows[0]]]
+    return list(itemgetter(*rows)(values))
+
+
+def _house_columns(table: Any, columns: Dict[str, str]):
+    """The House columns of a table as a polars DataFrame named by House attribute, cast once."""
+    import polars as pl
+    from ..data.cleaner import to_snake_case
+    from ..data.table import LazyTable, TableRows
+
+    if isinstance(table, TableRows):
+        table = table.frame
+    elif isinstance(table, LazyTable):
+        table = table.lazy_frame
+    elif isinstance(table, np.ndarray):
+        if table.dtype.names is None:
+            raise Exception("A NumPy table must be a record (structured) array.")
+        table = pl.DataFrame({name: table[name] for name in table.dtype.names})
+    elif not isinstance(table, (pl.DataFrame, pl.LazyFrame)):
+        table = pl.from_arrow(table)
+    lazy = table.lazy()
+
+    available = lazy.collect_schema().names()
+    snake_case = {to_snake_case(name): name for name in available}
+    missing = [column for column in columns.values() if column not in available and column not in snake_case]
+    if missing:
+        raise Exception(f"Missing columns to build the housing market: {missing}")
+
+    types = {"id": pl.Int64, "price": pl.Float64, "area": pl.Float64, "bedrooms": pl.Int32,
+             "year_built": pl.Int32, "quality": pl.Int64}
+    frame = lazy.select([
+        pl.col(column if column in available else snake_case[column]).cast(types[attribute]).alias(attribute)
+        for attribute, column in columns.items()
+    ]).collect()
+    required = [attribute for attribute in frame.columns if attribute != "quality"]
+    nulls = [attribute for attribute in required if frame[attribute].null_count()]
+    if nulls:
+        raise Exception(f"Missing values in the housing market columns: {nulls}")
+    return frame
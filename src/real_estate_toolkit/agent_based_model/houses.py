@@ -1,6 +1,9 @@
 from enum import Enum
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, ClassVar, Optional
+
+# Default "current year" of the age based house attributes
+REFERENCE_YEAR = 2024
 
 class QualityScore(Enum):
     EXCELLENT = 5
@@ -18,6 +21,9 @@ class House:
     year_built: int
     quality_score: Optional[QualityScore]
     available: bool = True
+    # Market whose indexes are told when the house is sold (set by HousingMarket on the
+    # instance). Not a dataclass field, so asdict, repr and == leave the market alone.
+    _market: ClassVar[Optional[Any]] = None
     
     def calculate_price_per_square_foot(self) -> float:
         """
@@ -39,7 +45,7 @@ class House:
         
         return price_per_square_foot
 
-    def is_new_construction(self, current_year: int = 2024) -> bool:
+    def is_new_construction(self, current_year: int = REFERENCE_YEAR) -> bool:
         """
         Determine if house is considered new construction (< 5 years old).
         
@@ -53,7 +59,7 @@ class House:
         return (current_year - self.year_built < 5)
     
         
-    def get_quality_score(self) -> None:
+    def get_quality_score(self, current_year: int = REFERENCE_YEAR) -> None:
         """
         Generate a quality score based on house attributes.
         
@@ -66,7 +72,6 @@ class House:
             return self.quality_score
         
         
-        current_year = 2024
         age_score = max(5 - (current_year - self.year_built) // 10, 1) #higher score for newest houses
         size_score = min(self.area // 500, 5) # bigger houses score higher with a maximum of 5 points
         bedroom_score = min(self.bedrooms, 5) #more bedrooms with a maximum of 5 points
@@ -94,5 +99,7 @@ class House:
         
         if self.available:
             self.available = False
+            if self._market is not None:
+                self._market._on_house_sold(self)
         else:
             raise Exception(f"House with ID {self.id} is already sold.")
\ No newline at end of file
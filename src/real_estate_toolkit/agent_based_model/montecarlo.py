@@ -0,0 +1,239 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import product
+from multiprocessing import shared_memory
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import math
+import multiprocessing
+import os
+import time
+import numpy as np
+
+from .house_market import HousingMarket
+from .simulation import Simulation, AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism
+from .store import HouseStore
+
+# Simulation fields a Monte Carlo run can vary
+PARAMETERS = ("interest_rate", "saving_rate", "down_payment_percentage", "cleaning_market_mechanism",
+              "consumers_number", "years")
+# Statistics recorded for every run (and summarized with confidence intervals)
+STATISTICS = ("owners_rate", "availability_rate", "matches")
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Name, dtype and shape of a NumPy array placed in shared memory."""
+    name: str
+    dtype: str
+    shape: Tuple[int, ...]
+
+
+def share_house_store(store: HouseStore) -> Tuple[Dict[str, SharedArray], List[shared_memory.SharedMemory]]:
+    """Copy the arrays of a HouseStore into shared memory blocks (the caller unlinks them)."""
+    descriptors, blocks = {}, []
+    for name, array in store.columns().items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        descriptors[name] = SharedArray(block.name, array.dtype.str, array.shape)
+        blocks.append(block)
+    return descriptors, blocks
+
+
+def _attach(shared: SharedArray) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+    try:
+        block = shared_memory.SharedMemory(name=shared.name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        block = shared_memory.SharedMemory(name=shared.name)
+    array = np.ndarray(shared.shape, dtype=np.dtype(shared.dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array, block
+
+
+# Worker state: the shared house arrays, attached once per process
+_shared_houses: Dict[str, np.ndarray] = {}
+_shared_blocks: List[shared_memory.SharedMemory] = []
+
+
+def _init_worker(descriptors: Dict[str, SharedArray]) -> None:
+    for name, shared in descriptors.items():
+        array, block = _attach(shared)
+        _shared_houses[name] = array
+        _shared_blocks.append(block)
+
+
+def _run_simulation(run: int, seed: np.random.SeedSequence, parameters: Dict[str, Any],
+                    settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: one simulation on a private copy of the availability of the shared houses."""
+    start = time.perf_counter()
+    # Only `available` changes during a run (and `quality` when the market derives missing
+    # scores); the other columns are read from shared memory
+    store = HouseStore(**{
+        name: array.copy() if name == "available" or (name == "quality" and not array.all()) else array
+        for name, array in _shared_houses.items()
+    })
+    simulation = Simulation(housing_market_data=[], agent_store=True, seed=seed, **{**settings, **parameters})
+    simulation.house_store = store
+    simulation.housing_market = HousingMarket.from_store(store, simulation.reference_year)
+
+    simulation.create_consumers()
+    simulation.compute_consumers_savings()
+    simulation.clean_the_market()
+
+    owners = simulation.consumers.owners
+    return {
+        "run": run,
+        "seed": "/".join(str(key) for key in (seed.entropy, *seed.spawn_key)),
+        **{name: value.name if isinstance(value, CleaningMarketMechanism) else value
+           for name, value in parameters.items()},
+        "owners_rate": owners / simulation.consumers_number,
+        "availability_rate": float(np.count_nonzero(store.available)) / len(store),
+        "matches": simulation.clearing_report.matches,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+@dataclass
+class ConfidenceInterval:
+    parameters: Dict[str, Any]
+    statistic: str
+    runs: int
+    mean: float
+    standard_deviation: float
+    low: float
+    high: float
+
+
+@dataclass
+class MonteCarloRunner:
+    """Runs many simulations of the same housing market in a pool of processes.
+
+    The houses are converted once to a HouseStore whose arrays are placed in shared
+    memory, so workers attach to them instead of receiving the housing market data
+    with every run. Every run gets its own SeedSequence child of `seed`, so results do
+    not depend on the number of workers or on which worker ran what. Results are written
+    to a Parquet file as runs finish, and `summarize` gives normal-approximation
+    confidence intervals per parameter combination.
+    """
+    housing_market_data: List[Dict[str, Any]]
+    consumers_number: int
+    years: int
+    annual_income: AnnualIncomeStatistics
+    children_range: ChildrenRange
+    cleaning_market_mechanism: CleaningMarketMechanism = CleaningMarketMechanism.RANDOM
+    workers: Optional[int] = None
+    seed: int = 0
+    # Finished runs buffered before they are written as one Parquet row group
+    write_batch_size: int = 256
+    results: List[Dict[str, Any]] = field(default_factory=list, init=False, repr=False)
+
+    def runs(self, grid: Dict[str, Sequence[Any]], replications: int) -> List[Dict[str, Any]]:
+        """Every combination of the grid values, each repeated `replications` times."""
+        unknown = set(grid) - set(PARAMETERS)
+        if unknown:
+            raise Exception(f"Unknown simulation parameters: {sorted(unknown)}")
+        names = list(grid)
+        combinations = [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+        return [parameters for parameters in combinations for _ in range(replications)]
+
+    def run(self, grid: Optional[Dict[str, Sequence[Any]]] = None, replications: int = 100,
+            output_path: Optional[Union[str, Path]] = None) -> List[Dict[str, Any]]:
+        """
+        Run `replications` simulations per combination of the grid (a single combination
+        with the runner settings when grid is None). Each finished run is appended to
+        output_path (Parquet) if given. Returns the results ordered by run.
+        """
+        runs = self.runs(grid or {}, replications)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(runs))
+        settings = {
+            "consumers_number": self.consumers_number,
+            "years": self.years,
+            "annual_income": self.annual_income,
+            "children_range": self.children_range,
+            "cleaning_market_mechanism": self.cleaning_market_mechanism,
+        }
+
+        store = HouseStore.from_records(self.housing_market_data)
+        descriptors, blocks = share_house_store(store)
+        writer = _ResultWriter(output_path, self.write_batch_size) if output_path is not None else None
+        self.results = []
+        try:
+            # Workers are spawned: forking after polars started its threads can deadlock
+            context = multiprocessing.get_context("spawn")
+            workers = self.workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(descriptors,)) as pool:
+                futures = [
+                    pool.submit(_run_simulation, run, seed, parameters, settings)
+                    for run, (seed, parameters) in enumerate(zip(seeds, runs))
+                ]
+                for future in as_completed(futures):
+                    result = future.result()
+                    self.results.append(result)
+                    if writer is not None:
+                        writer.write(result)
+        finally:
+            if writer is not None:
+                writer.close()
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        self.results.sort(key=lambda result: result["run"])
+        return self.results
+
+    def summarize(self, confidence: float = 0.95,
+                  results: Optional[List[Dict[str, Any]]] = None) -> List[ConfidenceInterval]:
+        """Mean and normal-approximation confidence interval of every statistic, per parameter combination."""
+        results = self.results if results is None else results
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+        for result in results:
+            key = tuple((name, result[name]) for name in PARAMETERS if name in result)
+            groups.setdefault(key, []).append(result)
+
+        intervals = []
+        for key, group in groups.items():
+            for statistic in STATISTICS:
+                values = np.array([result[statistic] for result in group], dtype=np.float64)
+                mean = float(values.mean())
+                standard_deviation = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+                margin = z * standard_deviation / math.sqrt(len(values))
+                intervals.append(ConfidenceInterval(
+                    dict(key), statistic, len(values), mean, standard_deviation, mean - margin, mean + margin
+                ))
+        return intervals
+
+
+class _ResultWriter:
+    """Streams result rows to a Parquet file, one row group per `batch_size` rows."""
+
+    def __init__(self, output_path: Union[str, Path], batch_size: int):
+        self.output_path = Path(output_path)
+        self.batch_size = batch_size
+        self.buffer: List[Dict[str, Any]] = []
+        self.writer = None
+
+    def write(self, result: Dict[str, Any]) -> None:
+        self.buffer.append(result)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self.buffer:
+            return
+        table = pa.Table.from_pylist(self.buffer)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(str(self.output_path), table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+        self.buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,123 @@
+from math import ceil, erfc, sqrt
+from typing import Optional, Tuple
+import numpy as np
+
+from .consumers import Segment
+from .store import ConsumerStore, HouseStore
+
+# Coefficients of Acklam's rational approximation of the normal quantile (relative error < 1.2e-9)
+_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+      1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+      6.680131188771972e+01, -1.328068155288572e+01)
+_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+      -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+      3.754408661907416e+00)
+_P_LOW = 0.02425
+
+# Below this acceptance rate rejection sampling wastes too many draws, use the inverse CDF
+MIN_ACCEPTANCE = 0.25
+
+
+def normal_cdf(x: float) -> float:
+    """Standard normal cumulative distribution function."""
+    return 0.5 * erfc(-x / sqrt(2))
+
+
+def normal_ppf(p: np.ndarray) -> np.ndarray:
+    """Standard normal quantile function (inverse CDF), element-wise, for 0 < p < 1."""
+    p = np.asarray(p, dtype=np.float64)
+    x = np.empty_like(p)
+
+    low = p < _P_LOW
+    high = p > 1 - _P_LOW
+    central = ~(low | high)
+
+    q = p[central] - 0.5
+    r = q * q
+    x[central] = (((((_A[0] * r + _A[1]) * r + _A[2]) * r + _A[3]) * r + _A[4]) * r + _A[5]) * q / \
+        (((((_B[0] * r + _B[1]) * r + _B[2]) * r + _B[3]) * r + _B[4]) * r + 1)
+
+    for mask, sign, tail in ((low, 1.0, p[low]), (high, -1.0, 1 - p[high])):
+        q = np.sqrt(-2 * np.log(tail))
+        x[mask] = sign * (((((_C[0] * q + _C[1]) * q + _C[2]) * q + _C[3]) * q + _C[4]) * q + _C[5]) / \
+            ((((_D[0] * q + _D[1]) * q + _D[2]) * q + _D[3]) * q + 1)
+    return x
+
+
+def truncated_normal(generator: np.random.Generator, size: int, mean: float, standard_deviation: float,
+                     minimum: float, maximum: float) -> np.ndarray:
+    """Draw `size` values of a normal distribution truncated to [minimum, maximum].
+
+    When most draws fall inside the bounds they are drawn in bulk and the ones outside are
+    rejected (as Simulation.create_consumers does one at a time). With tight bounds the
+    uniform draws are mapped through the inverse CDF of the truncated distribution, so the
+    cost does not depend on how unlikely the interval is.
+    """
+    if minimum > maximum:
+        raise Exception("The minimum cannot be greater than the maximum of a truncated normal distribution.")
+    if standard_deviation <= 0:
+        if not minimum <= mean <= maximum:
+            raise Exception("The average is outside of [minimum, maximum] and the standard deviation is zero.")
+        return np.full(size, float(mean))
+
+    lower = (minimum - mean) / standard_deviation
+    upper = (maximum - mean) / standard_deviation
+    # Work on the side of the mean where the CDF keeps its precision
+    flip = lower > 0
+    if flip:
+        lower, upper = -upper, -lower
+    cdf_lower, cdf_upper = normal_cdf(lower), normal_cdf(upper)
+    acceptance = cdf_upper - cdf_lower
+
+    if acceptance >= MIN_ACCEPTANCE:
+        values = np.empty(size)
+        filled = 0
+        while filled < size:
+            remaining = size - filled
+            draws = generator.standard_normal(ceil(remaining / acceptance * 1.05) + 16)
+            draws = draws[(draws >= lower) & (draws <= upper)][:remaining]
+            values[filled:filled + len(draws)] = draws
+            filled += len(draws)
+    else:
+        uniform = generator.uniform(cdf_lower, cdf_upper, size)
+        # Keep p strictly inside (0, 1) and the values inside the bounds
+        uniform = np.clip(uniform, np.nextafter(0.0, 1.0), np.nextafter(1.0, 0.0))
+        values = np.clip(normal_ppf(uniform), lower, upper)
+
+    if flip:
+        values = -values
+    return mean + standard_deviation * values
+
+
+def draw_population(generator: np.random.Generator, size: int, annual_income, children_range) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Annual incomes (truncated normal), children numbers and Segment values of `size` consumers.
+
+    annual_income and children_range are the AnnualIncomeStatistics and ChildrenRange of a
+    Simulation. Children and segments are uniform integers, like randint in create_consumers.
+    """
+    incomes = truncated_normal(
+        generator, size, annual_income.average, annual_income.standard_deviation,
+        annual_income.minimum, annual_income.maximum,
+    )
+    children = generator.integers(int(children_range.minimum), int(children_range.maximum), size, endpoint=True)
+    segments = generator.integers(1, len(Segment), size, endpoint=True)
+    return incomes, children, segments
+
+
+def generate_consumers(size: int, annual_income, children_range, generator: Optional[np.random.Generator] = None,
+                       saving_rate: float = 0.3, interest_rate: float = 0.05,
+                       houses: Optional[HouseStore] = None) -> ConsumerStore:
+    """Create a population of `size` consumers directly into a ConsumerStore."""
+    if generator is None:
+        generator = np.random.default_rng()
+    incomes, children, segments = draw_population(generator, size, annual_income, children_range)
+    return ConsumerStore.from_columns(
+        annual_income=incomes,
+        children_number=children,
+        segment=segments,
+        saving_rate=saving_rate,
+        interest_rate=interest_rate,
+        houses=houses,
+    )
@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+from .consumers import Segment
+from .house_market import HousingMarket
+from .houses import QualityScore
+
+
+@dataclass
+class PriceDynamics:
+    """Demand-driven repricing of a HousingMarket, one vectorized step per period.
+
+    Houses are grouped by neighborhood (when `neighborhoods` maps house ids to one),
+    bedroom band and quality band. The supply of a group is its houses available when the
+    period started; its demand is its houses sold during the period plus the buy attempts
+    that found no house. Those count for the bedroom band of their minimum bedrooms (and
+    the EXCELLENT quality band for FANCY consumers), split among the groups of that band in
+    proportion to their supply. Every house of a group gets its price multiplied by
+    1 + sensitivity * (demand - supply) / supply, a change of at most max_change.
+
+    Use it with HousingMarket.reprice, or as Simulation.price_dynamics to reprice after
+    every clearing of a stepped simulation.
+    """
+    sensitivity: float = 0.1
+    max_change: float = 0.05
+    # Largest number of bedrooms / quality score of every band but the last (open) one
+    bedroom_bands: Tuple[int, ...] = (1, 2, 3, 4)
+    quality_bands: Tuple[int, ...] = (2, 4)
+    neighborhoods: Optional[Dict[int, Any]] = None
+    _neighborhood_codes: Optional[Tuple[np.ndarray, np.ndarray, int]] = field(default=None, init=False, repr=False)
+
+    def _neighborhoods(self, ids: np.ndarray) -> Tuple[np.ndarray, int]:
+        """Neighborhood code of every house and number of neighborhoods (cached per id column)."""
+        if self.neighborhoods is None:
+            return np.zeros(len(ids), dtype=np.int64), 1
+        if self._neighborhood_codes is None or self._neighborhood_codes[0] is not ids:
+            labels: Dict[Any, int] = {}
+            codes = np.fromiter(
+                (labels.setdefault(self.neighborhoods.get(house_id), len(labels)) for house_id in ids.tolist()),
+                dtype=np.int64, count=len(ids),
+            )
+            self._neighborhood_codes = (ids, codes, max(len(labels), 1))
+        return self._neighborhood_codes[1], self._neighborhood_codes[2]
+
+    def groups(self, market: HousingMarket) -> Tuple[np.ndarray, int]:
+        """Group of every house of the market (by position) and number of groups."""
+        columns = market.columns()
+        neighborhoods, neighborhood_count = self._neighborhoods(columns["id"])
+        bedroom_band = np.searchsorted(self.bedroom_bands, columns["bedrooms"])
+        quality_band = np.searchsorted(self.quality_bands, columns["quality"])
+        bedroom_count, quality_count = len(self.bedroom_bands) + 1, len(self.quality_bands) + 1
+        groups = (neighborhoods * bedroom_count + bedroom_band) * quality_count + quality_band
+        return groups, neighborhood_count * bedroom_count * quality_count
+
+    def excess_demand(self, market: HousingMarket) -> Tuple[np.ndarray, np.ndarray]:
+        """Group of every house and (demand - supply) / supply of every group (0 without supply)."""
+        groups, group_count = self.groups(market)
+        period_available, sold, unmet_demand = market.period_demand()
+        supply = np.bincount(groups[period_available], minlength=group_count).astype(np.float64)
+        demand = np.bincount(groups[sold], minlength=group_count).astype(np.float64)
+
+        quality_count = len(self.quality_bands) + 1
+        group_bedroom_band = np.arange(group_count) // quality_count % (len(self.bedroom_bands) + 1)
+        group_quality_band = np.arange(group_count) % quality_count
+        excellent_band = np.searchsorted(self.quality_bands, QualityScore.EXCELLENT.value)
+        for (min_bedrooms, segment), attempts in unmet_demand.items():
+            selected = group_bedroom_band == np.searchsorted(self.bedroom_bands, min_bedrooms)
+            if segment == Segment.FANCY:
+                selected &= group_quality_band == excellent_band
+            band_supply = supply[selected].sum()
+            if band_supply > 0:
+                demand[selected] += attempts * supply[selected] / band_supply
+
+        excess = np.zeros(group_count)
+        np.divide(demand - supply, supply, out=excess, where=supply > 0)
+        return groups, excess
+
+    def prices(self, market: HousingMarket) -> np.ndarray:
+        """New price of every house of the market (by position) for the demand of the period."""
+        groups, excess = self.excess_demand(market)
+        change = np.clip(self.sensitivity * excess, -self.max_change, self.max_change)
+        return market.columns()["price"] * (1 + change[groups])
@@ -0,0 +1,186 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows: no process high-water mark
+    resource = None
+
+
+def max_rss() -> Optional[int]:
+    """High-water mark of the resident memory of the process, in bytes (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class PhaseStatistics:
+    """Totals of one phase (over all its calls at the same place in the phase stack)."""
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    # Wall time not spent in nested phases
+    self_seconds: float = 0.0
+    # Process resident memory high-water mark when the phase last ended
+    max_rss: Optional[int] = None
+    # Peak of the Python allocations traced during the phase (trace_memory only)
+    peak_traced_memory: Optional[int] = None
+
+
+@dataclass
+class _OpenPhase:
+    path: str
+    wall_start: float
+    cpu_start: float
+    child_seconds: float = 0.0
+    peak_traced_memory: int = 0
+
+
+@dataclass
+class Profiler:
+    """Phase timers and counters of a simulation run.
+
+    Phases (Simulation.create_housing_market, clean_the_market, step...) record wall and
+    CPU time, nested phases included, and the memory high-water mark of the process; with
+    trace_memory the peak of the Python allocations of every phase is traced too, at the
+    cost of tracemalloc slowing the phases down several times. Counters are added by the
+    hot paths of the housing market (queries, houses scanned, index hits, matches, failed
+    purchases).
+
+    Results export as JSON (to_json), as a Chrome trace event file for chrome://tracing,
+    Perfetto or speedscope (to_trace) and as folded stacks for flamegraph.pl (folded).
+    A disabled profiler (or none: Simulation.profiler is None by default) costs one
+    attribute check per phase or counted operation.
+    """
+    enabled: bool = True
+    trace_memory: bool = False
+    phases: Dict[str, PhaseStatistics] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    _stack: List[_OpenPhase] = field(default_factory=list, init=False, repr=False)
+    _origin: float = field(default_factory=time.perf_counter, init=False, repr=False)
+    _started_tracing: bool = field(default=False, init=False, repr=False)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the body of a with block as the phase `name` (nested in the open phases)."""
+        if not self.enabled:
+            yield
+            return
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                # Traced until the outermost phase ends
+                tracemalloc.start()
+                self._started_tracing = True
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_traced_memory = max(parent.peak_traced_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        path = f"{self._stack[-1].path};{name}" if self._stack else name
+        opened = _OpenPhase(path, time.perf_counter(), time.process_time())
+        self._stack.append(opened)
+        try:
+            yield
+        finally:
+            self._close(opened, name)
+
+    def _close(self, opened: _OpenPhase, name: str) -> None:
+        wall_end, cpu_end = time.perf_counter(), time.process_time()
+        self._stack.pop()
+        wall_seconds = wall_end - opened.wall_start
+        statistics = self.phases.setdefault(opened.path, PhaseStatistics())
+        statistics.calls += 1
+        statistics.wall_seconds += wall_seconds
+        statistics.cpu_seconds += cpu_end - opened.cpu_start
+        statistics.self_seconds += wall_seconds - opened.child_seconds
+        statistics.max_rss = max_rss()
+        args: Dict[str, Any] = {"cpu_ms": (cpu_end - opened.cpu_start) * 1e3}
+        if self.trace_memory:
+            peak = max(opened.peak_traced_memory, tracemalloc.get_traced_memory()[1])
+            statistics.peak_traced_memory = max(statistics.peak_traced_memory or 0, peak)
+            args["peak_traced_memory"] = peak
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_seconds += wall_seconds
+            if self.trace_memory:
+                parent.peak_traced_memory = max(parent.peak_traced_memory, args["peak_traced_memory"])
+        elif self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.events.append({
+            "name": name,
+            "ph": "X",
+            "ts": (opened.wall_start - self._origin) * 1e6,
+            "dur": wall_seconds * 1e6,
+            "pid": os.getpid(),
+            "tid": 0,
+            "args": args,
+        })
+
+    def reset(self) -> None:
+        """Forget every phase, counter and event."""
+        self.phases.clear()
+        self.counters.clear()
+        self.events.clear()
+        self._origin = time.perf_counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": {path: asdict(statistics) for path, statistics in self.phases.items()},
+            "counters": dict(self.counters),
+            "max_rss": max_rss(),
+        }
+
+    def to_json(self, path: Optional[Union[str, Path]] = None) -> str:
+        """Phases (by ';'-separated phase stack), counters and memory as JSON, written to path if given."""
+        return _write(json.dumps(self.to_dict(), indent=2), path)
+
+    def to_trace(self, path: Optional[Union[str, Path]] = None) -> str:
+        """Chrome trace event JSON (one complete event per phase call, counters at the end)."""
+        end = (time.perf_counter() - self._origin) * 1e6
+        counters = [{"name": "counters", "ph": "C", "ts": end, "pid": os.getpid(), "tid": 0,
+                     "args": dict(self.counters)}] if self.counters else []
+        return _write(json.dumps({"traceEvents": self.events + counters, "displayTimeUnit": "ms"}), path)
+
+    def folded(self, path: Optional[Union[str, Path]] = None) -> str:
+        """Folded stacks for flamegraph.pl: one 'phase;nested phase microseconds' line per phase (self time)."""
+        lines = [f"{stack} {round(statistics.self_seconds * 1e6)}" for stack, statistics in self.phases.items()]
+        return _write("\n".join(lines) + "\n", path)
+
+
+def _write(text: str, path: Optional[Union[str, Path]]) -> str:
+    if path is not None:
+        Path(path).write_text(text)
+    return text
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """Method decorator: run the method as a phase of self.profiler (if there is one)."""
+    def decorator(method: Callable) -> Callable:
+        phase_name = name or method.__name__
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = self.profiler
+            if profiler is None or not profiler.enabled:
+                return method(self, *args, **kwargs)
+            with profiler.phase(phase_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
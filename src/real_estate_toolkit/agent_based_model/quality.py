@@ -0,0 +1,64 @@
+from typing import Any, Optional, Sequence, Tuple
+import numpy as np
+
+from .houses import House, QualityScore, REFERENCE_YEAR
+
+
+def quality_from_overall_qual(overall_qual: Any) -> Optional[QualityScore]:
+    """Map the 1-10 overall_qual of the housing data to a QualityScore (overall_qual // 2, within 1-5)."""
+    if overall_qual is None:
+        return None
+    if isinstance(overall_qual, QualityScore):
+        return overall_qual
+    return QualityScore(max(1, min(5, int(overall_qual) // 2)))
+
+
+def overall_qual_codes(overall_qual: Sequence[Any]) -> np.ndarray:
+    """quality_from_overall_qual for a whole column, as QualityScore values (0 when missing)."""
+    if isinstance(overall_qual, np.ndarray) and overall_qual.dtype.kind in "iu":
+        return np.clip(overall_qual // 2, 1, 5).astype(np.int8)
+    return np.array(
+        [0 if value is None else quality_from_overall_qual(value).value for value in overall_qual],
+        dtype=np.int8,
+    )
+
+
+def derived_quality_scores(year_built: np.ndarray, area: np.ndarray, bedrooms: np.ndarray,
+                           current_year: int = REFERENCE_YEAR) -> np.ndarray:
+    """House.get_quality_score for many houses at once, as QualityScore values (1-5)."""
+    year_built = np.asarray(year_built, dtype=np.int64)
+    age_score = np.maximum(5 - (current_year - year_built) // 10, 1)
+    size_score = np.minimum(np.asarray(area, dtype=np.float64) // 500, 5)
+    bedroom_score = np.minimum(np.asarray(bedrooms, dtype=np.int64), 5)
+    overall_score = np.round((age_score + size_score + bedroom_score) / 3)
+    return np.clip(overall_score, 1, 5).astype(np.int8)
+
+
+def new_construction(year_built: np.ndarray, current_year: int = REFERENCE_YEAR) -> np.ndarray:
+    """House.is_new_construction for many houses at once. Houses built after current_year
+    (where is_new_construction raises) are not new construction."""
+    age = current_year - np.asarray(year_built, dtype=np.int64)
+    return (age >= 0) & (age < 5)
+
+
+def score_houses(houses: Sequence[House], current_year: int = REFERENCE_YEAR) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quality scores and new construction flags of an inventory in one pass.
+
+    Houses without a quality score get the one get_quality_score would derive (it is set
+    on the house too); the quality scores are returned as QualityScore values.
+    """
+    year_built = np.array([house.year_built for house in houses], dtype=np.int64)
+    quality = overall_qual_codes([house.quality_score for house in houses])
+    missing = np.flatnonzero(quality == 0)
+    if missing.size:
+        derived = derived_quality_scores(
+            year_built[missing],
+            [houses[index].area for index in missing.tolist()],
+            [houses[index].bedrooms for index in missing.tolist()],
+            current_year,
+        )
+        quality[missing] = derived
+        for index, code in zip(missing.tolist(), derived.tolist()):
+            houses[index].quality_score = QualityScore(code)
+    return quality, new_construction(year_built, current_year)
@@ -0,0 +1,73 @@
+from typing import Sequence, Union
+import numpy as np
+
+from .consumers import Consumer
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def round_like_python(values: ArrayLike, decimals: int = 2) -> np.ndarray:
+    """Round as Python's round(value, decimals) does, element-wise.
+
+    np.round scales by 10**decimals, which can move a value that is not exactly halfway
+    onto the tie (or off it). Those few elements are rounded with round() itself.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, decimals)
+    scaled = values * 10.0 ** decimals
+    distance_to_tie = np.abs(scaled - np.floor(scaled) - 0.5)
+    near_tie = np.flatnonzero(np.isfinite(scaled) & (distance_to_tie <= 16 * np.spacing(np.abs(scaled))))
+    if near_tie.size:
+        flat = rounded.reshape(-1)
+        source = values.reshape(-1)
+        for index in near_tie.tolist():
+            flat[index] = round(float(source[index]), decimals)
+    return rounded
+
+
+def compound_growth_minus_one(rate: ArrayLike, periods: ArrayLike) -> np.ndarray:
+    """(1 + rate)**periods - 1, element-wise, through expm1/log1p: accurate for small rates,
+    where the power is too close to 1 to subtract it."""
+    return np.expm1(np.asarray(periods, dtype=np.float64) * np.log1p(np.asarray(rate, dtype=np.float64)))
+
+
+def accumulated_savings(savings: ArrayLike, annual_income: ArrayLike, saving_rate: ArrayLike,
+                        interest_rate: ArrayLike, years: ArrayLike) -> np.ndarray:
+    """Savings after `years` years of Consumer.compute_savings, for every consumer at once.
+
+    Every year the consumer adds annual_income * saving_rate and then earns interest, so
+    after n years the savings are the annuity
+
+        savings * g**n + annual_income * saving_rate * g * (g**n - 1) / (g - 1),  g = 1 + interest_rate
+
+    (savings + n * annual_income * saving_rate without interest). All arguments broadcast,
+    so rates and horizons can differ per consumer; the cost does not depend on `years`.
+    The result is rounded to cents like compute_savings.
+    """
+    savings = np.asarray(savings, dtype=np.float64)
+    annual_savings = np.asarray(annual_income, dtype=np.float64) * np.asarray(saving_rate, dtype=np.float64)
+    interest_rate = np.asarray(interest_rate, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+
+    growth_minus_one = compound_growth_minus_one(interest_rate, years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity_factor = np.where(
+            interest_rate == 0, years, (1 + interest_rate) * growth_minus_one / interest_rate
+        )
+    total_savings = savings * (growth_minus_one + 1) + annual_savings * annuity_factor
+    return round_like_python(total_savings, 2)
+
+
+def compute_consumers_savings(consumers: Sequence[Consumer], years: int) -> None:
+    """Consumer.compute_savings(years) for a list of consumers, computed in one batch."""
+    if len(consumers) == 0:
+        return
+    savings = accumulated_savings(
+        savings=[consumer.savings for consumer in consumers],
+        annual_income=[consumer.annual_income for consumer in consumers],
+        saving_rate=[consumer.saving_rate for consumer in consumers],
+        interest_rate=[consumer.interest_rate for consumer in consumers],
+        years=years,
+    )
+    for consumer, value in zip(consumers, savings.tolist()):
+        consumer.savings = value
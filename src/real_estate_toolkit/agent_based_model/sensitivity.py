@@ -0,0 +1,196 @@
+from dataclasses import dataclass, field, replace
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .simulation import Simulation
+
+# Statistics returned for every sample point
+OUTPUTS = ("owners_rate", "availability_rate")
+
+Bounds = Dict[str, Tuple[float, float]]
+
+
+def grid_design(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the grid values."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+
+
+def scale(unit: np.ndarray, bounds: Bounds) -> List[Dict[str, float]]:
+    """Map rows of points in [0, 1]^k to parameter values (columns in bounds order)."""
+    names = list(bounds)
+    low = np.array([bounds[name][0] for name in names], dtype=np.float64)
+    high = np.array([bounds[name][1] for name in names], dtype=np.float64)
+    values = low + unit * (high - low)
+    return [dict(zip(names, row)) for row in values.tolist()]
+
+
+def latin_hypercube(bounds: Bounds, samples: int, generator: np.random.Generator) -> List[Dict[str, float]]:
+    """Latin hypercube design: every parameter range is split in `samples` strata, each used once."""
+    k = len(bounds)
+    strata = np.argsort(generator.random((samples, k)), axis=0)
+    unit = (strata + generator.random((samples, k))) / samples
+    return scale(unit, bounds)
+
+
+def morris_design(bounds: Bounds, trajectories: int, levels: int,
+                  generator: np.random.Generator) -> Tuple[np.ndarray, float]:
+    """
+    Morris one-at-a-time trajectories in [0, 1]^k: (trajectories * (k + 1), k) points where
+    consecutive points of a trajectory differ by +delta in one parameter.
+    """
+    k = len(bounds)
+    delta = levels / (2 * (levels - 1))
+    start_levels = np.arange(levels) / (levels - 1)
+    start_levels = start_levels[start_levels <= 1 - delta + 1e-12]
+    points = np.empty((trajectories, k + 1, k))
+    for trajectory in range(trajectories):
+        point = generator.choice(start_levels, size=k)
+        points[trajectory, 0] = point
+        for step, parameter in enumerate(generator.permutation(k), start=1):
+            point = point.copy()
+            point[parameter] += delta
+            points[trajectory, step] = point
+    return points.reshape(-1, k), delta
+
+
+def morris_indices(unit: np.ndarray, outputs: np.ndarray, names: Sequence[str], delta: float) -> Dict[str, Dict[str, float]]:
+    """mu, mu* (mean absolute elementary effect) and sigma of the elementary effects of every parameter."""
+    k = len(names)
+    unit = unit.reshape(-1, k + 1, k)
+    outputs = outputs.reshape(-1, k + 1)
+    effects: List[List[float]] = [[] for _ in range(k)]
+    for points, values in zip(unit, outputs):
+        moved = np.argmax(np.abs(np.diff(points, axis=0)), axis=1)
+        for step, parameter in enumerate(moved.tolist()):
+            effects[parameter].append((values[step + 1] - values[step]) / delta)
+    indices = {}
+    for name, parameter_effects in zip(names, effects):
+        parameter_effects = np.array(parameter_effects)
+        indices[name] = {
+            "mu": float(parameter_effects.mean()),
+            "mu_star": float(np.abs(parameter_effects).mean()),
+            "sigma": float(parameter_effects.std(ddof=1)) if len(parameter_effects) > 1 else 0.0,
+        }
+    return indices
+
+
+def sobol_design(k: int, samples: int, generator: np.random.Generator) -> np.ndarray:
+    """Saltelli design in [0, 1]^k: A, B and the k matrices AB_i (A with column i of B), stacked."""
+    a = generator.random((samples, k))
+    b = generator.random((samples, k))
+    blocks = [a, b]
+    for parameter in range(k):
+        ab = a.copy()
+        ab[:, parameter] = b[:, parameter]
+        blocks.append(ab)
+    return np.vstack(blocks)
+
+
+def sobol_indices(outputs: np.ndarray, names: Sequence[str], samples: int) -> Dict[str, Dict[str, float]]:
+    """First order (Saltelli 2010) and total (Jansen) Sobol indices from outputs of a sobol_design."""
+    # Centered on the mean of A and B: the first order estimator is not shift invariant
+    outputs = np.asarray(outputs, dtype=np.float64)
+    outputs = outputs - np.mean(outputs[:2 * samples])
+    f_a, f_b = outputs[:samples], outputs[samples:2 * samples]
+    variance = np.var(np.concatenate([f_a, f_b]))
+    indices = {}
+    for parameter, name in enumerate(names):
+        f_ab = outputs[(2 + parameter) * samples:(3 + parameter) * samples]
+        if variance == 0:
+            indices[name] = {"first_order": float("nan"), "total": float("nan")}
+            continue
+        indices[name] = {
+            "first_order": float(np.mean(f_b * (f_ab - f_a)) / variance),
+            "total": float(0.5 * np.mean((f_a - f_ab) ** 2) / variance),
+        }
+    return indices
+
+
+@dataclass
+class SweepEngine:
+    """Runs a base Simulation at many parameter points on a single housing market.
+
+    The market (House conversion and indexes, or the HouseStore in agent_store mode) is
+    built once from the base simulation and restored to its initial state before every
+    point, which only reindexes the houses sold by the previous run. Parameters are
+    Simulation fields ("interest_rate", "consumers_number", ...) or fields of its
+    statistics ("annual_income.average", "children_range.maximum"); values are rounded
+    when the base value is an integer. With common_random_numbers every point uses the
+    same seed, which removes the sampling noise from the differences between points.
+    """
+    simulation: Simulation
+    seed: int = 0
+    common_random_numbers: bool = True
+    _snapshot: Optional[List[Tuple[float, bool]]] = field(default=None, init=False, repr=False)
+
+    def _prepare_market(self) -> None:
+        if self._snapshot is None:
+            self.simulation.create_housing_market()
+            self._snapshot = self.simulation.housing_market.snapshot()
+
+    def _configure(self, parameters: Dict[str, Any], seed: np.random.SeedSequence) -> Simulation:
+        changes: Dict[str, Any] = {"seed": seed}
+        for name, value in parameters.items():
+            owner, _, attribute = name.rpartition(".")
+            base = getattr(getattr(self.simulation, owner) if owner else self.simulation, attribute)
+            if isinstance(base, int) and not isinstance(base, bool):
+                value = int(round(value))
+            if owner:
+                nested = changes.get(owner, getattr(self.simulation, owner))
+                changes[owner] = replace(nested, **{attribute: value})
+            else:
+                changes[name] = value
+        simulation = replace(self.simulation, **changes)
+        simulation.housing_market = self.simulation.housing_market
+        if self.simulation.agent_store:
+            simulation.house_store = self.simulation.house_store
+        return simulation
+
+    def run(self, points: Sequence[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """owners_rate and availability_rate (not rounded) of a simulation at every point."""
+        self._prepare_market()
+        seeds = np.random.SeedSequence(self.seed).spawn(1 if self.common_random_numbers else len(points))
+        results = []
+        for number, parameters in enumerate(points):
+            simulation = self._configure(parameters, seeds[0 if self.common_random_numbers else number])
+            simulation.housing_market.restore(self._snapshot)
+            simulation.create_consumers()
+            simulation.compute_consumers_savings()
+            simulation.clean_the_market()
+            results.append({
+                "owners_rate": simulation._owners() / simulation.consumers_number,
+                "availability_rate": simulation._available_houses() / len(simulation.housing_market.houses),
+            })
+        self.simulation.housing_market.restore(self._snapshot)
+        return results
+
+    def grid(self, grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Run every combination of the grid; each row has the parameters and the outputs."""
+        points = grid_design(grid)
+        return [{**point, **outputs} for point, outputs in zip(points, self.run(points))]
+
+    def latin_hypercube(self, bounds: Bounds, samples: int) -> List[Dict[str, Any]]:
+        """Run a Latin hypercube sample of the parameter bounds."""
+        points = latin_hypercube(bounds, samples, np.random.default_rng(self.seed))
+        return [{**point, **outputs} for point, outputs in zip(points, self.run(points))]
+
+    def morris(self, bounds: Bounds, trajectories: int = 10, levels: int = 4) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Morris elementary effects screening: output -> parameter -> mu, mu_star, sigma."""
+        unit, delta = morris_design(bounds, trajectories, levels, np.random.default_rng(self.seed))
+        results = self.run(scale(unit, bounds))
+        return {
+            output: morris_indices(unit, np.array([result[output] for result in results]), list(bounds), delta)
+            for output in OUTPUTS
+        }
+
+    def sobol(self, bounds: Bounds, samples: int = 128) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Sobol first order and total indices: output -> parameter -> first_order, total.
+        Costs samples * (number of parameters + 2) simulations."""
+        unit = sobol_design(len(bounds), samples, np.random.default_rng(self.seed))
+        results = self.run(scale(unit, bounds))
+        return {
+            output: sobol_indices(np.array([result[output] for result in results]), list(bounds), samples)
+            for output in OUTPUTS
+        }
@@ -1,10 +1,19 @@
 from enum import Enum, auto
-from dataclasses import dataclass
-from random import gauss, randint, shuffle
-from typing import List, Dict, Any
-from .houses import House
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any, Union, Callable, Optional
+import random
+import numpy as np
+from .houses import House, REFERENCE_YEAR
+from .quality import quality_from_overall_qual
 from .house_market import HousingMarket
 from .consumers import Segment, Consumer
+from .store import HouseStore, ConsumerStore
+from .savings import compute_consumers_savings
+from .population import generate_consumers
+from .clearing import ClearingEngine, ClearingReport
+from .affordability import AffordabilityEngine
+from .profiling import Profiler, profiled
+from .pricing import PriceDynamics
 
 class CleaningMarketMechanism(Enum):
     INCOME_ORDER_DESCENDANT = auto()
@@ -23,9 +32,41 @@ class ChildrenRange:
     minimum: float = 0
     maximum: float = 5
 
+class RandomStream(Enum):
+    POPULATION = auto() # incomes, children and segments of the consumers
+    ORDERING = auto() # consumer order of the RANDOM cleaning market mechanism
+    MARKET_EVENTS = auto() # free for hooks: new listings, price changes...
+
+class SimulationEvent(Enum):
+    BEFORE_CLEARING = auto() # hook(simulation, period): list new houses, update prices...
+    AFTER_STEP = auto() # hook(simulation, statistics) once the period is recorded
+
+@dataclass
+class PeriodStatistics:
+    period: int
+    owners: int
+    available_houses: int
+    owners_rate: float
+    availability_rate: float
+    matches: int
+    listed_houses: int
+    repriced_houses: int
+
+@dataclass
+class SimulationHistory:
+    """Time series of a stepped simulation, one PeriodStatistics per period."""
+    periods: List[PeriodStatistics] = field(default_factory=list)
+
+    def series(self, name: str) -> List[Any]:
+        """Values of one statistic over time, e.g. series("owners_rate")."""
+        return [getattr(statistics, name) for statistics in self.periods]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [asdict(statistics) for statistics in self.periods]
+
 @dataclass
 class Simulation:
-    housing_market_data: List[Dict[str, Any]]
+    housing_market_data: Union[List[Dict[str, Any]], Any]  # rows, or a table for HousingMarket.from_table
     consumers_number: int
     years: int
     annual_income: AnnualIncomeStatistics
@@ -34,7 +75,63 @@ class Simulation:
     down_payment_percentage: float = 0.2
     saving_rate: float = 0.3
     interest_rate: float = 0.05
+    # Mortgage terms of the consumers: payments up to this share of the income, over mortgage_years
+    debt_to_income_ratio: float = 0.36
+    mortgage_years: int = 30
+    # Keep houses and consumers in NumPy arrays (HouseStore/ConsumerStore) instead of objects
+    agent_store: bool = False
+    # int, SeedSequence or Generator (the root is drawn from its current state). Each
+    # RandomStream is an independent child of it, so a seed gives the same results
+    # wherever the simulation runs. None: the random module.
+    seed: Optional[Union[int, np.random.SeedSequence, np.random.Generator]] = None
+    # "Current year" of new construction and derived quality scores
+    reference_year: int = REFERENCE_YEAR
+    # Reprice the houses after every clearing of a stepped simulation (None: static prices)
+    price_dynamics: Optional[PriceDynamics] = None
+    # Phase timers and hot-path counters of the run (None: no instrumentation)
+    profiler: Optional[Profiler] = None
+    hooks: Dict[SimulationEvent, List[Callable]] = field(default_factory=dict, init=False, repr=False)
+    # Houses listed and repriced during the current period
+    _listed_houses: int = field(default=0, init=False, repr=False)
+    _repriced_houses: int = field(default=0, init=False, repr=False)
+    _streams: Optional[Dict[RandomStream, np.random.SeedSequence]] = field(default=None, init=False, repr=False)
+    _generators: Dict[Any, Any] = field(default_factory=dict, init=False, repr=False)
+    _affordability: Optional[AffordabilityEngine] = field(default=None, init=False, repr=False)
+
+    def _stream(self, stream: RandomStream) -> np.random.SeedSequence:
+        if self._streams is None:
+            if self.seed is None:
+                # Drawn from random, so random.seed still reproduces the run
+                root = np.random.SeedSequence(random.getrandbits(128))
+            elif isinstance(self.seed, np.random.Generator):
+                # Drawn from the generator: simulations sharing it (or given it after it was
+                # used) get different streams, like any other consumer of its randomness
+                root = np.random.SeedSequence(self.seed.integers(0, 2**63, 4).tolist())
+            elif isinstance(self.seed, np.random.SeedSequence):
+                # A copy: spawning from a shared SeedSequence would depend on earlier spawns
+                root = np.random.SeedSequence(self.seed.entropy, spawn_key=self.seed.spawn_key)
+            else:
+                root = np.random.SeedSequence(self.seed)
+            self._streams = dict(zip(RandomStream, root.spawn(len(RandomStream))))
+        return self._streams[stream]
+
+    def rng(self, stream: RandomStream) -> np.random.Generator:
+        """NumPy generator of one random stream of the simulation."""
+        key = (stream, "numpy")
+        if key not in self._generators:
+            self._generators[key] = np.random.default_rng(self._stream(stream))
+        return self._generators[key]
+
+    def _random(self, stream: RandomStream):
+        """random.Random of one random stream (the random module itself when there is no seed)."""
+        if self.seed is None:
+            return random
+        if stream not in self._generators:
+            state = self._stream(stream).generate_state(4, np.uint64)
+            self._generators[stream] = random.Random(int.from_bytes(state.tobytes(), "little"))
+        return self._generators[stream]
     
+    @profiled()
     def create_housing_market(self):
         """
         Initialize market with houses.
@@ -45,18 +142,32 @@ class Simulation:
         - Use a for loop for create the List[Consumers] object needed to use the housing market.
         - Assign self.housing_market to the class.
         """
-        self.housing_market = HousingMarket([
+        if not isinstance(self.housing_market_data, list):
+            # A table (polars, TableRows, LazyTable, Arrow, record array): built column by column
+            self.housing_market = HousingMarket.from_table(self.housing_market_data, self.reference_year)
+            self.house_store = self.housing_market.house_store
+        elif self.agent_store:
+            self.house_store = HouseStore.from_records(self.housing_market_data)
+            self.housing_market = HousingMarket.from_store(self.house_store, self.reference_year)
+        else:
+            self.housing_market = HousingMarket(self._create_houses(self.housing_market_data), self.reference_year)
+        self.housing_market.profiler = self.profiler
+
+    @staticmethod
+    def _create_houses(housing_market_data: List[Dict[str, Any]]) -> List[House]:
+        return [
             House(
                 id=house_data['id'],
                 price=house_data['sale_price'],
                 area=house_data['lot_area'],
                 bedrooms=house_data['bedroom_abv_gr'],
                 year_built=house_data['year_built'],
-                quality_score=house_data["overall_qual"]
+                quality_score=quality_from_overall_qual(house_data["overall_qual"])
             )
-            for house_data in self.housing_market_data
-        ])
+            for house_data in housing_market_data
+        ]
 
+    @profiled()
     def create_consumers(self) -> None:
         """
         Generate consumer population.
@@ -74,16 +185,30 @@ class Simulation:
         - Assign segments appropriately
         """
 
-        self.consumers: List[Consumer] = []
+        if self.agent_store:
+            # Drawn in bulk from the population stream
+            self.consumers: Union[List[Consumer], ConsumerStore] = generate_consumers(
+                self.consumers_number,
+                self.annual_income,
+                self.children_range,
+                generator=self.rng(RandomStream.POPULATION),
+                saving_rate=self.saving_rate,
+                interest_rate=self.interest_rate,
+                houses=getattr(self, "house_store", None),
+            )
+            return
+
+        population = self._random(RandomStream.POPULATION)
+        self.consumers = []
         for consumer_idx in range(self.consumers_number):
             while True:
-                income = gauss(self.annual_income.average, self.annual_income.standard_deviation)
+                income = population.gauss(self.annual_income.average, self.annual_income.standard_deviation)
                 if self.annual_income.minimum <= income <= self.annual_income.maximum:
                     break
             
-            children = randint(self.children_range.minimum, self.children_range.maximum)
+            children = population.randint(self.children_range.minimum, self.children_range.maximum)
 
-            segment = Segment(randint(1, len(Segment)))
+            segment = Segment(population.randint(1, len(Segment)))
         
             self.consumers.append(
                 Consumer(
@@ -98,6 +223,7 @@ class Simulation:
                 )
             )
     
+    @profiled()
     def compute_consumers_savings(self) -> None:
         """
         Calculate savings for all consumers.
@@ -106,9 +232,12 @@ class Simulation:
         - Apply saving rate consistently to all consumers.
         - Handle edge cases
         """
-        for consumer in self.consumers:
-            consumer.compute_savings(self.years)
+        if self.agent_store:
+            self.consumers.compute_savings(self.years)
+        else:
+            compute_consumers_savings(self.consumers, self.years)
 
+    @profiled()
     def clean_the_market(self) -> None:
         """
         Execute market transactions.
@@ -119,20 +248,45 @@ class Simulation:
         - Track successful purchases
         - Handle market clearing
         """
+        # The market may have been built elsewhere (sweeps, Monte Carlo workers)
+        self.housing_market.profiler = self.profiler
+        engine = ClearingEngine(self.housing_market, self.affordability())
+        if self.agent_store:
+            self.clearing_report = engine.clear(self.consumers, self._store_order())
+            return
 
         if self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_DESCENDANT:
             self.consumers.sort(key=lambda consumer: consumer.annual_income, reverse=True)
         elif self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_ASCENDANT:
             self.consumers.sort(key=lambda consumer: consumer.annual_income)
         elif self.cleaning_market_mechanism == CleaningMarketMechanism.RANDOM:
-            shuffle(self.consumers)
+            self._random(RandomStream.ORDERING).shuffle(self.consumers)
 
-        for consumer in self.consumers:
-            try:
-                consumer.buy_a_house(self.housing_market)
-            except:
-                break
+        self.clearing_report: ClearingReport = engine.clear(self.consumers)
 
+    def affordability(self) -> AffordabilityEngine:
+        """Engine of the maximum price every consumer can pay, kept (with its cache) while the
+        mortgage terms of the simulation do not change."""
+        engine = self._affordability
+        if engine is None or (engine.down_payment_percentage, engine.debt_to_income_ratio, engine.mortgage_years) \
+                != (self.down_payment_percentage, self.debt_to_income_ratio, self.mortgage_years):
+            self._affordability = AffordabilityEngine(
+                self.down_payment_percentage, self.debt_to_income_ratio, self.mortgage_years
+            )
+        return self._affordability
+
+    def _store_order(self) -> List[int]:
+        """Rows of the ConsumerStore in the order of the cleaning market mechanism."""
+        incomes = self.consumers.annual_income
+        if self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_DESCENDANT:
+            order = np.argsort(-incomes, kind="stable").tolist()
+        elif self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_ASCENDANT:
+            order = np.argsort(incomes, kind="stable").tolist()
+        else:
+            order = list(range(len(self.consumers)))
+            if self.cleaning_market_mechanism == CleaningMarketMechanism.RANDOM:
+                self._random(RandomStream.ORDERING).shuffle(order)
+        return order
 
     def compute_owners_population_rate(self) -> float:
         """
@@ -141,7 +295,7 @@ class Simulation:
         Implementation tips:
         - Total consumers who bought a house over total consumers number
         """
-        owners = sum(1 for consumer in self.consumers if consumer.house is not None)
+        owners = self._owners()
         return round(owners / self.consumers_number, 2)
     
     def compute_houses_availability_rate(self) -> float:
@@ -151,7 +305,108 @@ class Simulation:
         Implementation tips:
         - Houses available over total houses number
         """
-        available_houses = sum(1 for house in self.housing_market.houses if house.available)
+        available_houses = self._available_houses()
         total_houses = len(self.housing_market.houses)
         return round(available_houses / total_houses, 2)
 
+
+    def _owners(self) -> int:
+        if self.agent_store:
+            return self.consumers.owners
+        return sum(1 for consumer in self.consumers if consumer.house is not None)
+
+    def _available_houses(self) -> int:
+        if self.agent_store:
+            return int(np.count_nonzero(self.house_store.available))
+        return sum(1 for house in self.housing_market.houses if house.available)
+
+    def add_hook(self, event: SimulationEvent, hook: Callable) -> None:
+        """Call hook at every step of a stepped simulation (see SimulationEvent for its arguments)."""
+        self.hooks.setdefault(event, []).append(hook)
+
+    def list_houses(self, housing_market_data: List[Dict[str, Any]]) -> int:
+        """
+        Put new houses (rows like housing_market_data) on the market.
+        Only the new houses are indexed, the rest of the market is left as is.
+        """
+        if self.agent_store:
+            houses = self.house_store.extend(HouseStore.from_records(housing_market_data))
+        else:
+            houses = self._create_houses(housing_market_data)
+        self.housing_market.add_houses(houses)
+        self._listed_houses += len(houses)
+        return len(houses)
+
+    def update_prices(self, prices: Dict[int, float]) -> int:
+        """Set new prices (house id -> price); only those houses are reindexed."""
+        for house_id, price in prices.items():
+            self.housing_market.update_price(house_id, price)
+        self._repriced_houses += len(prices)
+        return len(prices)
+
+    def start(self) -> None:
+        """
+        Prepare a stepped simulation: create the market and the consumers (unless they
+        already exist) and start the history at period 0.
+        """
+        if not hasattr(self, "housing_market"):
+            self.create_housing_market()
+        if not hasattr(self, "consumers"):
+            self.create_consumers()
+        self.period = 0
+        self.history = SimulationHistory()
+
+    @profiled()
+    def step(self) -> PeriodStatistics:
+        """
+        Advance the simulation one year: every consumer saves one more year, the
+        BEFORE_CLEARING hooks list houses and change prices, the market is cleaned, the
+        price dynamics (if any) reprice the houses and the owners and availability rates
+        are recorded.
+        """
+        if not hasattr(self, "history"):
+            self.start()
+        self.period += 1
+
+        # One year on top of the current savings, not the whole horizon again
+        if self.agent_store:
+            self.consumers.compute_savings(1)
+        else:
+            compute_consumers_savings(self.consumers, 1)
+
+        self._listed_houses = self._repriced_houses = 0
+        for hook in self.hooks.get(SimulationEvent.BEFORE_CLEARING, []):
+            hook(self, self.period)
+
+        self.clean_the_market()
+        if self.price_dynamics is not None:
+            # From the demand of this period, for the next clearing
+            self._repriced_houses += self._reprice()
+
+        owners, available_houses = self._owners(), self._available_houses()
+        statistics = PeriodStatistics(
+            period=self.period,
+            owners=owners,
+            available_houses=available_houses,
+            owners_rate=owners / self.consumers_number,
+            availability_rate=available_houses / len(self.housing_market.houses),
+            matches=self.clearing_report.matches,
+            listed_houses=self._listed_houses,
+            repriced_houses=self._repriced_houses,
+        )
+        self.history.periods.append(statistics)
+        for hook in self.hooks.get(SimulationEvent.AFTER_STEP, []):
+            hook(self, statistics)
+        return statistics
+
+    @profiled("reprice")
+    def _reprice(self) -> int:
+        return self.housing_market.reprice(self.price_dynamics)
+
+    def run(self, periods: int) -> SimulationHistory:
+        """Run `periods` steps (e.g. 30 for a 30-year horizon) and return the history."""
+        if not hasattr(self, "history"):
+            self.start()
+        for period in range(periods):
+            self.step()
+        return self.history
@@ -0,0 +1,279 @@
+from dataclasses import dataclass, field, fields
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import numpy as np
+
+from .houses import House, QualityScore
+from .consumers import Segment, Consumer
+from .savings import accumulated_savings
+from .quality import overall_qual_codes, quality_from_overall_qual
+
+# House attribute -> column of the cleaned housing market data (as in Simulation.create_housing_market)
+HOUSE_DATA_COLUMNS = {
+    "id": "id",
+    "price": "sale_price",
+    "area": "lot_area",
+    "bedrooms": "bedroom_abv_gr",
+    "year_built": "year_built",
+    "quality": "overall_qual",
+}
+
+
+def _quality_code(quality_score: Any) -> int:
+    """QualityScore (or raw overall_qual) -> QualityScore value, None -> 0 (no quality score)."""
+    quality_score = quality_from_overall_qual(quality_score)
+    return 0 if quality_score is None else quality_score.value
+
+
+def _column(name: str, to_python: Callable[[Any], Any], to_array: Callable[[Any], Any] = lambda value: value) -> property:
+    """Property reading and writing row `_index` of the store array `name`."""
+
+    def getter(self):
+        return to_python(getattr(self._store, name)[self._index])
+
+    def setter(self, value):
+        getattr(self._store, name)[self._index] = to_array(value)
+
+    return property(getter, setter)
+
+
+@dataclass
+class HouseStore:
+    """Houses as a struct of NumPy arrays, one row per house.
+
+    quality holds the QualityScore value (overall_qual of the housing data is mapped with
+    quality_from_overall_qual), 0 when the house has no quality score.
+    """
+    id: np.ndarray
+    price: np.ndarray
+    area: np.ndarray
+    bedrooms: np.ndarray
+    year_built: np.ndarray
+    quality: np.ndarray
+    available: np.ndarray
+    # HousingMarket of the views of this store (told when one of them is sold)
+    market: Optional[Any] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_columns(cls, id, price, area, bedrooms, year_built, quality=None, available=None) -> "HouseStore":
+        size = len(id)
+        return cls(
+            id=np.asarray(id, dtype=np.int64),
+            price=np.asarray(price, dtype=np.float64),
+            area=np.asarray(area, dtype=np.float64),
+            bedrooms=np.asarray(bedrooms, dtype=np.int32),
+            year_built=np.asarray(year_built, dtype=np.int32),
+            quality=np.zeros(size, dtype=np.int8) if quality is None else np.asarray(quality, dtype=np.int8),
+            available=np.ones(size, dtype=bool) if available is None else np.asarray(available, dtype=bool),
+        )
+
+    @classmethod
+    def from_houses(cls, houses: Sequence[House]) -> "HouseStore":
+        return cls.from_columns(
+            id=[house.id for house in houses],
+            price=[house.price for house in houses],
+            area=[house.area for house in houses],
+            bedrooms=[house.bedrooms for house in houses],
+            year_built=[house.year_built for house in houses],
+            quality=overall_qual_codes([house.quality_score for house in houses]),
+            available=[house.available for house in houses],
+        )
+
+    @classmethod
+    def from_records(cls, housing_market_data: Sequence[Dict[str, Any]]) -> "HouseStore":
+        """Build the store from cleaned housing market rows (see HOUSE_DATA_COLUMNS)."""
+        columns = {
+            attribute: [row[column] for row in housing_market_data]
+            for attribute, column in HOUSE_DATA_COLUMNS.items()
+        }
+        columns["quality"] = overall_qual_codes(columns["quality"])
+        return cls.from_columns(**columns)
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, index: int) -> "HouseView":
+        return HouseView(self, index)
+
+    def __iter__(self) -> Iterator["HouseView"]:
+        return (HouseView(self, index) for index in range(len(self)))
+
+    def extend(self, other: "HouseStore") -> List["HouseView"]:
+        """Append the rows of another store and return views of the new rows."""
+        start = len(self)
+        for name, array in self.columns().items():
+            setattr(self, name, np.concatenate([array, getattr(other, name)]))
+        return [HouseView(self, index) for index in range(start, len(self))]
+
+    def views(self) -> "HouseViews":
+        """The House views of the rows, created on access (e.g. the houses of a HousingMarket
+        built on the store)."""
+        return HouseViews(self)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.columns().values())
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The array of every house attribute, by name."""
+        return {column.name: getattr(self, column.name) for column in fields(self) if column.type is np.ndarray}
+
+
+@dataclass
+class ConsumerStore:
+    """Consumers as a struct of NumPy arrays, one row per consumer.
+
+    segment holds the Segment value and house the row of the owned house in `houses`
+    (-1 when the consumer has no house).
+    """
+    id: np.ndarray
+    annual_income: np.ndarray
+    children_number: np.ndarray
+    segment: np.ndarray
+    savings: np.ndarray
+    saving_rate: np.ndarray
+    interest_rate: np.ndarray
+    house: np.ndarray
+    houses: Optional[HouseStore] = None
+
+    @classmethod
+    def from_columns(cls, annual_income, children_number, segment, savings=0.0, saving_rate=0.3,
+                     interest_rate=0.05, id=None, houses: Optional[HouseStore] = None) -> "ConsumerStore":
+        size = len(annual_income)
+        return cls(
+            id=np.arange(size, dtype=np.int64) if id is None else np.asarray(id, dtype=np.int64),
+            annual_income=np.asarray(annual_income, dtype=np.float64),
+            children_number=np.asarray(children_number, dtype=np.int32),
+            segment=np.asarray(segment, dtype=np.int8),
+            savings=np.broadcast_to(np.asarray(savings, dtype=np.float64), size).copy(),
+            saving_rate=np.broadcast_to(np.asarray(saving_rate, dtype=np.float64), size).copy(),
+            interest_rate=np.broadcast_to(np.asarray(interest_rate, dtype=np.float64), size).copy(),
+            house=np.full(size, -1, dtype=np.int64),
+            houses=houses,
+        )
+
+    @classmethod
+    def from_consumers(cls, consumers: Sequence[Consumer], houses: Optional[HouseStore] = None) -> "ConsumerStore":
+        store = cls.from_columns(
+            id=[consumer.id for consumer in consumers],
+            annual_income=[consumer.annual_income for consumer in consumers],
+            children_number=[consumer.children_number for consumer in consumers],
+            segment=[consumer.segment.value for consumer in consumers],
+            savings=[consumer.savings for consumer in consumers],
+            saving_rate=[consumer.saving_rate for consumer in consumers],
+            interest_rate=[consumer.interest_rate for consumer in consumers],
+            houses=houses,
+        )
+        for view, consumer in zip(store, consumers):
+            view.house = consumer.house
+        return store
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, index: int) -> "ConsumerView":
+        return ConsumerView(self, index)
+
+    def __iter__(self) -> Iterator["ConsumerView"]:
+        return (ConsumerView(self, index) for index in range(len(self)))
+
+    def compute_savings(self, years: int) -> None:
+        """Consumer.compute_savings for every consumer at once (closed form, see accumulated_savings)."""
+        self.savings = accumulated_savings(
+            self.savings, self.annual_income, self.saving_rate, self.interest_rate, years
+        )
+
+    @property
+    def owners(self) -> int:
+        return int(np.count_nonzero(self.house >= 0))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+
+
+class HouseView(House):
+    """House whose attributes are a row of a HouseStore. All House methods work on it."""
+
+    def __init__(self, store: HouseStore, index: int):
+        self._store = store
+        self._index = index
+
+    id = _column("id", int)
+    price = _column("price", float)
+    area = _column("area", float)
+    bedrooms = _column("bedrooms", int)
+    year_built = _column("year_built", int)
+    quality_score = _column("quality", lambda code: QualityScore(code) if code else None, _quality_code)
+    available = _column("available", bool)
+
+    @property
+    def _market(self):
+        return self._store.market
+
+    @_market.setter
+    def _market(self, market) -> None:
+        self._store.market = market
+
+
+class HouseViews(Sequence):
+    """Lazy list of the House views of the first rows of a HouseStore.
+
+    A view is only created when its house is accessed. The length is the number of rows
+    when the sequence was created plus the views appended since, so rows added to the store
+    (HouseStore.extend) join once their views are appended, like a list of houses.
+    """
+
+    def __init__(self, store: HouseStore):
+        self.store = store
+        self._length = len(store)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [HouseView(self.store, row) for row in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("HouseViews index out of range")
+        return HouseView(self.store, index)
+
+    def __iter__(self) -> Iterator[HouseView]:
+        return map(HouseView, repeat(self.store, self._length), range(self._length))
+
+    def append(self, house: House) -> None:
+        if not (isinstance(house, HouseView) and house._store is self.store and house._index == self._length):
+            raise ValueError("Only the view of the next row of the HouseStore can be appended.")
+        self._length += 1
+
+
+class ConsumerView(Consumer):
+    """Consumer whose attributes are a row of a ConsumerStore. All Consumer methods work on it."""
+
+    def __init__(self, store: ConsumerStore, index: int):
+        self._store = store
+        self._index = index
+
+    id = _column("id", int)
+    annual_income = _column("annual_income", float)
+    children_number = _column("children_number", int)
+    segment = _column("segment", Segment, lambda segment: segment.value)
+    savings = _column("savings", float)
+    saving_rate = _column("saving_rate", float)
+    interest_rate = _column("interest_rate", float)
+
+    @property
+    def house(self) -> Optional[House]:
+        index = self._store.house[self._index]
+        return None if index < 0 else HouseView(self._store.houses, int(index))
+
+    @house.setter
+    def house(self, house: Optional[House]) -> None:
+        if house is None:
+            self._store.house[self._index] = -1
+        elif isinstance(house, HouseView) and house._store is self._store.houses:
+            self._store.house[self._index] = house._index
+        else:
+            raise ValueError("A consumer of a ConsumerStore can only own a house of its HouseStore.")
@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+import hashlib
+import json
+import os
+import polars as pl
+
+from .. import __version__
+from .cleaner import Cleaner
+from .table import TableRows
+
+
+@dataclass
+class DatasetCache:
+    """On-disk cache of parsed (and optionally cleaned) CSV files in Arrow IPC format.
+
+    Entries are keyed by the SHA-256 of the source file, the cleaning configuration and
+    the toolkit version, so a change to any of them is a cache miss and the stale entry
+    of that source is replaced. File hashes are remembered by (size, mtime), so a warm
+    load does not re-read the CSV at all. Entries are uncompressed Arrow IPC files, which
+    polars reopens memory-mapped (read_ipc default) instead of copying them into memory.
+    """
+    cache_dir: Path = Path(".real_estate_cache")
+    infer_schema_length: int = 10000
+    _hashes: Optional[Dict[str, Dict[str, Any]]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.cache_dir = Path(self.cache_dir)
+
+    @property
+    def _index_path(self) -> Path:
+        return self.cache_dir / "hashes.json"
+
+    def file_hash(self, source: Path) -> str:
+        """SHA-256 of the source file, recomputed only when its size or mtime changed."""
+        if self._hashes is None:
+            try:
+                self._hashes = json.loads(self._index_path.read_text())
+            except (OSError, ValueError):
+                self._hashes = {}
+        stat = os.stat(source)
+        key = str(Path(source).resolve())
+        known = self._hashes.get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+        digest = hashlib.sha256()
+        with open(source, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        self._hashes[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path.write_text(json.dumps(self._hashes, indent=1))
+        return digest.hexdigest()
+
+    def entry_path(self, source: Union[str, Path], clean: bool) -> Path:
+        """Path of the cache entry for a source file and cleaning configuration."""
+        configuration = {
+            "clean": clean,
+            "rename": "snake_case" if clean else None,
+            "na_to_none": ["NA"] if clean else [],
+            "infer_schema_length": self.infer_schema_length,
+            "version": __version__,
+        }
+        key = hashlib.sha256(
+            (self.file_hash(source) + json.dumps(configuration, sort_keys=True)).encode()
+        ).hexdigest()[:24]
+        return self.cache_dir / f"{self._source_prefix(source, clean)}-{key}.arrow"
+
+    def _source_prefix(self, source: Union[str, Path], clean: bool) -> str:
+        path = str(Path(source).resolve())
+        return f"{Path(source).stem}-{'clean' if clean else 'raw'}-{hashlib.sha1(path.encode()).hexdigest()[:8]}"
+
+    def load(self, source: Union[str, Path], clean: bool = False) -> TableRows:
+        """Return the parsed (clean=False) or parsed and cleaned (clean=True) table of a CSV.
+
+        On a hit the Arrow file is reopened memory-mapped, otherwise the CSV is parsed, cleaned
+        with Cleaner and written to the cache for the next run.
+        """
+        entry = self.entry_path(source, clean)
+        if entry.exists():
+            return TableRows(pl.read_ipc(entry))
+
+        table = TableRows(pl.read_csv(source, infer_schema_length=self.infer_schema_length))
+        if clean:
+            cleaner = Cleaner(table)
+            cleaner.rename_with_best_practices()
+            table = cleaner.na_to_none()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.cache_dir.glob(f"{self._source_prefix(source, clean)}-*.arrow"):
+            stale.unlink()
+        temporary = entry.with_suffix(".tmp")
+        table.frame.write_ipc(temporary, compression="uncompressed")
+        os.replace(temporary, entry)
+        return TableRows(pl.read_ipc(entry))
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for path in self.cache_dir.glob("*.arrow"):
+            path.unlink()
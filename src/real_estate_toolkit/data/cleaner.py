@@ -1,30 +1,70 @@
 from dataclasses import dataclass
-from typing import Dict, List, Union, Any
+from functools import lru_cache
+from typing import Dict, List, Union, Any, Iterable
 import re
+import polars as pl
+
+from .table import LazyTable, TableRows
+
+
+@lru_cache(maxsize=None)
+def to_snake_case(name: str) -> str:
+    """Convert a CamelCase column name to snake_case (cached, the header only needs it once)."""
+    s1 = re.sub('(.)([A-Z][a-z])', r'\1_\2', name)
+    return s1.lower()
+
+
+def snake_case_mapping(columns: Iterable[str]) -> Dict[str, str]:
+    """Old name -> snake_case name for every column."""
+    return {column: to_snake_case(column) for column in columns}
+
+
+def na_to_null(schema: pl.Schema) -> List[pl.Expr]:
+    """Expressions replacing "NA" by null in every string column of a polars frame."""
+    return [
+        pl.when(pl.col(name) == "NA").then(None).otherwise(pl.col(name)).alias(name)
+        for name, dtype in schema.items() if dtype == pl.String
+    ]
+
 
 @dataclass
 class Cleaner:
-    """Class for cleaning real estate data."""
-    data: List[Dict[str, Any]]
-    
+    """Class for cleaning real estate data.
+
+    Works on a list of dictionaries, or column by column when the data is a TableRows
+    or LazyTable from DataLoader (the result then stays a table; call to_dicts() on it
+    if a list of dictionaries is needed).
+    """
+    data: Union[List[Dict[str, Any]], TableRows, LazyTable]
+
     def rename_with_best_practices(self) -> None:
         """Rename the columns with best practices (e.g. snake_case very descriptive name)."""
-    
-        def to_snake_case(name: str) -> str:
-            s1 = re.sub('(.)([A-Z][a-z])', r'\1_\2', name)
-            return s1.lower()
+        if isinstance(self.data, TableRows):
+            self.data = TableRows(self.data.frame.rename(snake_case_mapping(self.data.columns)))
+            return
+        if isinstance(self.data, LazyTable):
+            self.data = LazyTable(self.data.lazy_frame.rename(snake_case_mapping(self.data.columns)))
+            return
 
+        mapping = snake_case_mapping(self.data[0].keys()) if len(self.data) > 0 else {}
         self.data = [
-            {f"{to_snake_case(key)}":value for key, value in row.items()}
+            {mapping[key] if key in mapping else to_snake_case(key): value for key, value in row.items()}
             for row in self.data
         ]
 
 
     def na_to_none(self) -> List[Dict[str, Any]]:
         """Replace NA to None in all values with NA in the dictionary."""
+        if isinstance(self.data, TableRows):
+            self.data = TableRows(self.data.frame.with_columns(na_to_null(self.data.frame.schema)))
+            return self.data
+        if isinstance(self.data, LazyTable):
+            self.data = LazyTable(self.data.lazy_frame.with_columns(na_to_null(self.data.schema)))
+            return self.data
+
         for row in self.data:
             for key, value in row.items():
                 if value == "NA":
                     row [key] = None
-        
+
         return self.data
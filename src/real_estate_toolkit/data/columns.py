@@ -0,0 +1,226 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Sequence, Union
+import math
+from itertools import repeat
+from operator import is_not, itemgetter
+import numpy as np
+import polars as pl
+
+from .table import TableRows
+
+
+@dataclass
+class NumericColumn:
+    """Typed numeric column (int64 or float64) with a validity mask.
+
+    Null cells are stored as 0 in `values` and flagged False in `valid`.
+    """
+    values: np.ndarray
+    valid: np.ndarray
+    _non_null: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+    _sorted: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+    is_numeric = True
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def null_count(self) -> int:
+        return int(len(self.valid) - np.count_nonzero(self.valid))
+
+    @property
+    def non_null(self) -> np.ndarray:
+        """Values without nulls (cached view)."""
+        if self._non_null is None:
+            self._non_null = self.values if self.null_count == 0 else self.values[self.valid]
+        return self._non_null
+
+    @property
+    def sorted_non_null(self) -> np.ndarray:
+        """Non null values sorted ascending (cached)."""
+        if self._sorted is None:
+            self._sorted = np.sort(self.non_null, kind="stable")
+        return self._sorted
+
+    def first_value(self) -> Any:
+        """Value in the first row, or None if it is null."""
+        if len(self.values) == 0 or not self.valid[0]:
+            return None
+        return self.values[0].item()
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.valid.nbytes
+
+
+@dataclass
+class CategoricalColumn:
+    """Dictionary encoded column.
+
+    `codes` holds the position of every cell in `categories` (-1 for nulls).
+    Categories are numbered in order of first appearance.
+    """
+    codes: np.ndarray
+    categories: List[Any]
+    _counts: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+    is_numeric = False
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def valid(self) -> np.ndarray:
+        return self.codes >= 0
+
+    @property
+    def null_count(self) -> int:
+        return int(np.count_nonzero(self.codes < 0))
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Occurrences of every category (cached)."""
+        if self._counts is None:
+            self._counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.categories))
+        return self._counts
+
+    def first_value(self) -> Any:
+        """Value in the first row, or None if it is null."""
+        if len(self.codes) == 0 or self.codes[0] < 0:
+            return None
+        return self.categories[self.codes[0]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+
+Column = Union[NumericColumn, CategoricalColumn]
+
+
+def build_column(values: List[Any]) -> Column:
+    """Infer the type of a list of cells and encode it as a typed column.
+
+    Columns whose non null cells are all int become int64, all int/float become
+    float64, anything else (strings, mixed types, all null) is dictionary encoded.
+    """
+    n = len(values)
+    kinds = set(map(type, values))
+    kinds.discard(type(None))
+
+    if kinds and kinds <= {int, float}:
+        dtype = np.int64 if kinds == {int} else np.float64
+        valid = np.fromiter(map(is_not, values, repeat(None)), dtype=bool, count=n)
+        if valid.all():
+            return NumericColumn(np.array(values, dtype=dtype), valid)
+        # None becomes NaN in a float conversion, then it is zero filled
+        array = np.array(values, dtype=np.float64)
+        array[~valid] = 0
+        return NumericColumn(array.astype(dtype, copy=False), valid)
+
+    index = {value: code for code, value in enumerate(dict.fromkeys(values))}
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int32, count=n)
+    categories = list(index)
+    if None in index:
+        none_code = index[None]
+        del categories[none_code]
+        nulls = codes == none_code
+        codes[codes > none_code] -= 1
+        codes[nulls] = -1
+    return CategoricalColumn(codes, categories)
+
+
+def column_from_series(series: pl.Series) -> Column:
+    """Encode a polars Series without going through Python objects."""
+    if series.dtype.is_integer() or series.dtype.is_float():
+        dtype = np.int64 if series.dtype.is_integer() else np.float64
+        valid = series.is_not_null().to_numpy()
+        return NumericColumn(series.fill_null(0).to_numpy().astype(dtype, copy=False), valid)
+    # Categories numbered by first appearance, nulls coded as -1
+    categories = series.drop_nulls().unique(maintain_order=True)
+    codes = series.replace_strict(
+        categories, pl.int_range(len(categories), dtype=pl.Int32, eager=True), default=None
+    ).fill_null(-1).to_numpy()
+    return CategoricalColumn(codes.astype(np.int32, copy=False), categories.to_list())
+
+
+def build_columns(data: List[Dict[str, Any]]) -> Dict[str, Column]:
+    """Turn a list of row dictionaries into typed columns, keyed like the first row."""
+    if isinstance(data, TableRows):
+        return {name: column_from_series(data.frame[name]) for name in data.columns}
+    if len(data) == 0:
+        return {}
+    keys = list(data[0].keys())
+    return {key: build_column(list(map(itemgetter(key), data))) for key in keys}
+
+
+def mean(column: NumericColumn) -> Optional[float]:
+    """Mean of the non null values, correctly rounded like statistics.mean."""
+    values = column.non_null
+    if len(values) == 0:
+        return None
+    if values.dtype.kind == "i":
+        return int(values.sum()) / len(values)
+    return math.fsum(values.tolist()) / len(values)
+
+
+def median_of_sorted(values: Sequence) -> Any:
+    """Median of an already sorted sequence, same convention as statistics.median."""
+    n = len(values)
+    if n == 0:
+        return None
+    middle = n // 2
+    if n % 2 == 1:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def percentile_of_sorted(values: Sequence, percentile: float) -> Optional[float]:
+    """Percentile of an already sorted sequence, with linear interpolation between closest ranks."""
+    n = len(values)
+    if n == 0:
+        return None
+    if n == 1:
+        return float(values[0])
+    i = (percentile / 100.0) * (n - 1)
+    lower = int(i)
+    upper = lower + 1
+    if upper >= n:
+        return float(values[-1])
+    fraction = i - lower
+    return float(values[lower] + fraction * (values[upper] - values[lower]))
+
+
+def median(column: NumericColumn) -> Optional[float]:
+    """Median of the non null values, same convention as statistics.median."""
+    value = median_of_sorted(column.sorted_non_null)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def percentile(column: NumericColumn, percentile: float) -> Optional[float]:
+    """Percentile of the non null values."""
+    return percentile_of_sorted(column.sorted_non_null, percentile)
+
+
+def std(column: NumericColumn) -> Optional[float]:
+    """Sample standard deviation of the non null values (None with less than two values)."""
+    values = column.non_null
+    if len(values) < 2:
+        return None
+    return float(np.std(values, ddof=1))
+
+
+def mode(column: Column) -> Any:
+    """Most common non null value; ties go to the value seen first, like statistics.mode."""
+    if not column.is_numeric:
+        if len(column.categories) == 0:
+            return None
+        return column.categories[int(np.argmax(column.counts))]
+
+    values = column.non_null
+    if len(values) == 0:
+        return None
+    unique, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+    candidates = np.flatnonzero(counts == counts.max())
+    return unique[candidates[np.argmin(first_index[candidates])]].item()
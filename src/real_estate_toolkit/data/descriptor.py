@@ -1,13 +1,39 @@
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Any, Union
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Any, Optional, Sequence, Union
 import numpy as np
 import statistics
 import math
+from . import columns as kernels
+from .columns import Column, build_columns
+from .table import LazyTable, TableRows
+
+@dataclass
+class ColumnSummary:
+    """Statistics of one column computed by describe().
+    Numeric statistics are None for non numeric columns, std is None with less than two values.
+    """
+    type: str
+    none_ratio: float
+    mode: Any
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    minimum: Optional[float] = None
+    median: Optional[float] = None
+    maximum: Optional[float] = None
+    percentiles: Dict[float, float] = field(default_factory=dict)
 
 @dataclass
 class Descriptor:
-    """Class for cleaning real estate data."""
-    data: List[Dict[str, Any]]
+    """Class for cleaning real estate data.
+
+    Tables from DataLoader (TableRows, LazyTable) are described column by column through
+    DescriptorColumnar: walking their rows would build every row dictionary again for
+    each column. The results are the same.
+    """
+    data: Union[List[Dict[str, Any]], TableRows, LazyTable]
+
+    def __post_init__(self):
+        self._columnar = DescriptorColumnar(self.data) if isinstance(self.data, (TableRows, LazyTable)) else None
 
     def none_ratio(self, columns: List[str] = "all"):
         """Compute the ratio of None value per column.
@@ -15,6 +41,8 @@ class Descriptor:
         Validate that column names are correct. If not make an exception.
         Return a dictionary with the key as the variable name and value as the ratio.
         """
+        if self._columnar is not None:
+            return self._columnar.none_ratio(columns)
         if columns == "all":
             columns = list(self.data[0].keys())
         else: 
@@ -37,6 +65,8 @@ class Descriptor:
         Validate that column names are correct and correspond to a numeric variable. If not make an exception.
         Return a dictionary with the key as the numeric variable name and value as the average
         """
+        if self._columnar is not None:
+            return self._columnar.average(columns)
         if columns == "all":
             columns = [column for column in self.data[0] if isinstance(self.data[0][column], (int, float))]
             if len(columns) != len(self.data[0].keys()):
@@ -64,6 +94,8 @@ class Descriptor:
         Validate that column names are correct and correspond to a numeric variable. If not make an exception.
         Return a dictionary with the key as the numeric variable name and value as the average
         """
+        if self._columnar is not None:
+            return self._columnar.median(columns)
         if columns == "all":
             columns = [column for column in self.data[0] if isinstance(self.data[0][column], (int, float))]
             if len(columns) != len(self.data[0].keys()):
@@ -90,6 +122,8 @@ class Descriptor:
         Validate that column names are correct and correspond to a numeric variable. If not make an exception.
         Return a dictionary with the key as the numeric variable name and value as the average
         """
+        if self._columnar is not None:
+            return self._columnar.percentile(columns, percentile)
         if columns == "all":
             columns = [column for column in self.data[0] if isinstance(self.data[0][column], (int, float))]
             if len(columns) != len(self.data[0].keys()):
@@ -104,20 +138,7 @@ class Descriptor:
         percentiles = {}
         for col in columns:
             values = sorted([row[col] for row in self.data if row[col] is not None])
-            n = len(values)
-            if n == 1:
-                percentiles[col] = float(values[0])
-                continue
-            i = (percentile / 100.0) * (n - 1)
-            lower = int(i)
-            upper = lower + 1
-    
-            if upper >= n:
-                p_value = float(values[-1])
-            else:
-                fraction = i - lower
-                p_value = float(values[lower] + fraction * (values[upper] - values[lower]))
-            percentiles[col] = p_value
+            percentiles[col] = kernels.percentile_of_sorted(values, percentile)
         return percentiles
 
     
@@ -128,6 +149,8 @@ class Descriptor:
         Return a dictionary with the key as the variable name and value as a tuple of the variable type and the mode.
         If the variable is categorical
         """
+        if self._columnar is not None:
+            return self._columnar.type_and_mode(columns)
         if columns == "all":
             columns = list(self.data[0].keys())
         else: 
@@ -150,148 +173,319 @@ class Descriptor:
             
         
         return result
-    
+
+    def describe(self, columns: List[str] = "all", percentiles: Sequence[float] = (25, 50, 75)) -> Dict[str, ColumnSummary]:
+        """Compute none ratio, mode and (for numeric variables) mean, std, min, median, max and
+        the requested percentiles in one go per column.
+        Values are collected and sorted once per column and reused for every order statistic.
+        Validate that column names are correct. If not make an exception.
+        Return a dictionary with the key as the variable name and value as a ColumnSummary.
+        """
+        if self._columnar is not None:
+            return self._columnar.describe(columns, percentiles)
+        if columns == "all":
+            columns = list(self.data[0].keys())
+        else:
+            for column in columns:
+                if column not in self.data[0]:
+                    raise Exception("Invalid column")
+
+        total = len(self.data)
+        result = {}
+        for col in columns:
+            values = [row[col] for row in self.data if row[col] is not None]
+            none_ratio = (total - len(values)) / total if total > 0 else 0
+
+            if not values:
+                result[col] = ColumnSummary("Unknown", none_ratio, None)
+                continue
+            if not isinstance(values[0], (int, float)):
+                result[col] = ColumnSummary("Categorical", none_ratio, statistics.mode(values))
+                continue
+
+            mean = statistics.mean(values)
+            ordered = sorted(values)
+            result[col] = ColumnSummary(
+                type="Numeric",
+                none_ratio=none_ratio,
+                mode=statistics.mode(values),
+                mean=mean,
+                std=statistics.stdev(values, mean) if len(values) > 1 else None,
+                minimum=ordered[0],
+                median=kernels.median_of_sorted(ordered),
+                maximum=ordered[-1],
+                percentiles={p: kernels.percentile_of_sorted(ordered, p) for p in percentiles},
+            )
+        return result
+
+
+@dataclass
+class DescriptorColumnar:
+    """Columnar version of Descriptor.
+
+    The rows are converted once into typed columns (numeric arrays with a null mask
+    and dictionary encoded categoricals) and every statistic is answered from them.
+    Results are the same dictionaries Descriptor returns.
+    """
+    data: Union[List[Dict[str, Any]], TableRows, LazyTable]
+
+    def __post_init__(self):
+        if isinstance(self.data, LazyTable):
+            # Every statistic needs the whole table: read it once, straight into columns
+            self.data = self.data.collect()
+        self.columns: Dict[str, Column] = build_columns(self.data)
+        self.row_count = len(self.data)
+
+    def _select(self, columns: List[str]) -> List[str]:
+        if columns == "all":
+            return list(self.columns)
+        for column in columns:
+            if column not in self.columns:
+                raise Exception("Invalid column")
+        return columns
+
+    def _is_number(self, column: str) -> bool:
+        return isinstance(self.columns[column].first_value(), (int, float))
+
+    def _select_numeric(self, columns: List[str]) -> List[str]:
+        if columns == "all":
+            columns = [column for column in self.columns if self._is_number(column)]
+            if len(columns) != len(self.columns):
+                raise Exception("Some columns does not correspond to numeric variables")
+        else:
+            columns = self._select(columns)
+            if not all(self._is_number(column) for column in columns):
+                raise Exception("Some columns does not correspond to numeric variables")
+        return columns
+
+    def none_ratio(self, columns: List[str] = "all") -> Dict[str, float]:
+        """Compute the ratio of None value per column."""
+        total = self.row_count
+        return {
+            col: self.columns[col].null_count / total if total > 0 else 0
+            for col in self._select(columns)
+        }
+
+    def average(self, columns: List[str] = "all") -> Dict[str, float]:
+        """Compute the average value for numeric variables. Omit None values."""
+        return {col: kernels.mean(self.columns[col]) for col in self._select_numeric(columns)}
+
+    def median(self, columns: List[str] = "all") -> Dict[str, float]:
+        """Compute the median value for numeric variables. Omit None values."""
+        return {col: kernels.median(self.columns[col]) for col in self._select_numeric(columns)}
+
+    def percentile(self, columns: List[str] = "all", percentile: int = 50) -> Dict[str, float]:
+        """Compute the percentile value for numeric variables. Omit None values."""
+        return {
+            col: kernels.percentile(self.columns[col], percentile)
+            for col in self._select_numeric(columns)
+        }
+
+    def type_and_mode(self, columns: List[str] = "all") -> Dict[str, Union[Tuple[str, float], Tuple[str, str]]]:
+        """Compute the type and mode for variables. Omit None values."""
+        result = {}
+        for col in self._select(columns):
+            column = self.columns[col]
+            if column.null_count == len(column):
+                result[col] = ("Unknown", None)
+            elif column.is_numeric:
+                result[col] = ("Numeric", kernels.mode(column))
+            else:
+                first = column.categories[0]
+                kind = "Numeric" if isinstance(first, (int, float)) else "Categorical"
+                result[col] = (kind, kernels.mode(column))
+        return result
+
+    def describe(self, columns: List[str] = "all", percentiles: Sequence[float] = (25, 50, 75)) -> Dict[str, ColumnSummary]:
+        """Compute every statistic of Descriptor.describe from the typed columns."""
+        total = self.row_count
+        result = {}
+        for col, (kind, mode) in self.type_and_mode(columns).items():
+            column = self.columns[col]
+            none_ratio = column.null_count / total if total > 0 else 0
+            if not column.is_numeric:
+                result[col] = ColumnSummary(kind, none_ratio, mode)
+                continue
+            ordered = column.sorted_non_null
+            result[col] = ColumnSummary(
+                type=kind,
+                none_ratio=none_ratio,
+                mode=mode,
+                mean=kernels.mean(column),
+                std=kernels.std(column),
+                minimum=ordered[0].item(),
+                median=kernels.median(column),
+                maximum=ordered[-1].item(),
+                percentiles={p: kernels.percentile(column, p) for p in percentiles},
+            )
+        return result
+
+
+def _mode_of_sorted(ordered: np.ndarray) -> Any:
+    """Moda de un array ordenado no vacío: la racha de valores iguales más larga (la primera,
+    es decir el menor valor, en caso de empate), sin volver a ordenar como np.unique."""
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(ordered)) + 1))
+    counts = np.diff(np.append(starts, len(ordered)))
+    return ordered[starts[np.argmax(counts)]]
+
 
 @dataclass
 class DescriptorNumpy:
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], TableRows, LazyTable]
  
     def __post_init__(self):
-        # Asumimos que todas las filas tienen las mismas claves
-        # Si no fuera el caso, habría que normalizar.
-        keys = list(self.data[0].keys())
-        # Creación de un dtype basado en objetos para flexibilidad
-        # Esto permite que las columnas tengan valores mixtos (None, str, float, etc.)
-        dtype = [(key, object) for key in keys]
-        # Construimos una lista de tuplas con el orden de las keys
-        structured_data = [
-            tuple(row.get(key, None) for key in keys) 
-            for row in self.data
-        ]
- 
-        # Creamos el array estructurado
-        self.array = np.array(structured_data, dtype=dtype)
+        if isinstance(self.data, LazyTable):
+            # Las tablas perezosas se leen una vez, directamente a columnas.
+            self.data = self.data.collect()
+        # Asumimos que todas las filas tienen las mismas claves (las de la primera fila).
+        # Inferimos el tipo de cada columna una sola vez: float64/int64 con máscara de
+        # validez para las numéricas y códigos enteros + tabla de categorías para el resto.
+        self.columns: Dict[str, Column] = build_columns(self.data)
+        self.row_count = len(self.data)
+        # Caché de valores numéricos sin None (float64) para cada columna numérica.
+        # None indica que la columna no es numérica.
+        self._numeric_values: Dict[str, Union[np.ndarray, None]] = {}
+        # Caché de esos valores ordenados, compartida por la moda y los estadísticos de orden.
+        self._sorted_values: Dict[str, Union[np.ndarray, None]] = {}
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por las columnas tipadas."""
+        return sum(column.nbytes for column in self.columns.values())
  
     def _filter_columns(self, columns: Union[List[str], str]) -> List[str]:
         """Filtra las columnas según el parámetro columns y verifica su existencia."""
         if columns == "all":
-            return list(self.array.dtype.names)
+            return list(self.columns)
         else:
-            # Filtramos las columnas que existen en el array
-            valid_columns = [col for col in columns if col in self.array.dtype.names]
+            # Filtramos las columnas que existen en los datos
+            valid_columns = [col for col in columns if col in self.columns]
             if not valid_columns:
                 raise ValueError("No se encontraron columnas válidas.")
             return valid_columns
+
+    def _numeric_view(self, col: str) -> Union[np.ndarray, None]:
+        """Devuelve los valores no nulos de la columna como float64, o None si no es numérica."""
+        if col not in self._numeric_values:
+            column = self.columns[col]
+            if column.is_numeric:
+                values = column.non_null.astype(float, copy=False)
+            elif len(column.categories) == 0:
+                # Columna vacía después de filtrar None
+                values = None
+            else:
+                # Probamos la conversión a float sobre la tabla de categorías (valores únicos)
+                # y no sobre todas las filas.
+                try:
+                    table = np.array(column.categories, dtype=float)
+                    values = table[column.codes[column.codes >= 0]]
+                except (ValueError, TypeError):
+                    values = None
+            self._numeric_values[col] = values
+        return self._numeric_values[col]
  
+    def _sorted_numeric_view(self, col: str) -> Union[np.ndarray, None]:
+        """Valores numéricos no nulos ordenados (float64), o None si la columna no es numérica.
+        Las columnas numéricas reutilizan el orden cacheado de la columna (el de la moda)."""
+        if col not in self._sorted_values:
+            column = self.columns[col]
+            if column.is_numeric:
+                values = column.sorted_non_null.astype(float, copy=False)
+            else:
+                values = self._numeric_view(col)
+                values = np.sort(values) if values is not None else None
+            self._sorted_values[col] = values
+        return self._sorted_values[col]
+
     def none_ratio(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
         """Calcula la proporción de valores None en las columnas seleccionadas."""
         columns = self._filter_columns(columns)
-        none_ratios = {}
-        total_rows = len(self.array)
+        total_rows = self.row_count
         if total_rows == 0:
             return {col: 0.0 for col in columns}
- 
-        for col in columns:
-            col_data = self.array[col]
-            # Contamos cuantos None hay
-            none_count = np.sum(col_data == None)
-            none_ratios[col] = none_count / total_rows
-        return none_ratios
+        return {col: self.columns[col].null_count / total_rows for col in columns}
  
     def _get_numeric_columns(self, columns: List[str]) -> List[str]:
         """Devuelve sólo las columnas numéricas de la lista proporcionada."""
-        numeric_cols = []
-        for col in columns:
-            # Intentamos convertir la columna a float ignorando None
-            col_data = self.array[col]
-            # Filtramos None
-            filtered = [x for x in col_data if x is not None]
-            if not filtered:
-                # Columna vacía después de filtrar None
-                continue
-            # Probamos conversión a float
-            try:
-                _ = np.array(filtered, dtype=float)
-                numeric_cols.append(col)
-            except ValueError:
-                # Si no se puede convertir a numérico, ignoramos esta columna
-                pass
-        return numeric_cols
- 
-    def average(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
-        """Computa el valor promedio para columnas numéricas."""
+        return [col for col in columns if self._numeric_view(col) is not None]
+
+    def _numeric_statistic(self, columns: Union[List[str], str], statistic) -> Dict[str, float]:
         all_cols = self._filter_columns(columns)
         numeric_cols = self._get_numeric_columns(all_cols)
  
         if not numeric_cols:
             raise ValueError("No se especificaron columnas numéricas válidas.")
-        averages = {}
+        result = {}
         for col in numeric_cols:
-            col_data = self.array[col]
-            filtered = [x for x in col_data if x is not None]
-            if len(filtered) > 0:
-                filtered_arr = np.array(filtered, dtype=float)
-                averages[col] = float(np.mean(filtered_arr))
-            else:
-                averages[col] = np.nan
-        return averages
+            values = self._numeric_view(col)
+            result[col] = float(statistic(values)) if len(values) > 0 else np.nan
+        return result
+ 
+    def average(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+        """Computa el valor promedio para columnas numéricas."""
+        return self._numeric_statistic(columns, np.mean)
  
     def median(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
         """Computa la mediana para columnas numéricas."""
-        all_cols = self._filter_columns(columns)
-        numeric_cols = self._get_numeric_columns(all_cols)
- 
-        if not numeric_cols:
-            raise ValueError("No se especificaron columnas numéricas válidas.")
-        medians = {}
-        for col in numeric_cols:
-            col_data = self.array[col]
-            filtered = [x for x in col_data if x is not None]
-            if filtered:
-                filtered_arr = np.array(filtered, dtype=float)
-                medians[col] = float(np.median(filtered_arr))
-            else:
-                medians[col] = np.nan
-        return medians
+        return self._numeric_statistic(columns, np.median)
  
     def percentile(self, columns: Union[List[str], str] = "all", percentile: float = 50.0) -> Dict[str, float]:
         """Computa un percentil específico para columnas numéricas."""
-        all_cols = self._filter_columns(columns)
-        numeric_cols = self._get_numeric_columns(all_cols)
- 
-        if not numeric_cols:
-            raise ValueError("No se especificaron columnas numéricas válidas.")
-        percentiles = {}
-        for col in numeric_cols:
-            col_data = self.array[col]
-            filtered = [x for x in col_data if x is not None]
-            if filtered:
-                filtered_arr = np.array(filtered, dtype=float)
-                percentiles[col] = float(np.percentile(filtered_arr, percentile))
-            else:
-                percentiles[col] = np.nan
-        return percentiles
+        return self._numeric_statistic(columns, lambda values: np.percentile(values, percentile))
  
     def type_and_mode(self, columns: Union[List[str], str] = "all") -> Dict[str, Tuple[str, Any]]:
         """Determina el tipo y la moda para las columnas."""
         columns = self._filter_columns(columns)
         type_and_modes = {}
         for col in columns:
-            col_data = self.array[col]
-            filtered = [x for x in col_data if x is not None]
- 
-            # Determinamos el tipo predominante mirando el dtype del array estructurado.
-            # Como es object, el tipo no está claro. Intentamos inferir del primer valor filtrado.
-            if not filtered:
+            column = self.columns[col]
+            if column.null_count == len(column):
                 # Sin datos
                 type_and_modes[col] = ("unknown", None)
                 continue
-            # Inferir tipo:
-            sample = filtered[0]
-            var_type = type(sample).__name__
- 
-            # Moda:
-            unique_vals, counts = np.unique(filtered, return_counts=True)
-            mode = unique_vals[np.argmax(counts)]
+
+            if column.is_numeric:
+                # El tipo es el del array (int o float); la moda sale de las rachas de valores
+                # iguales del array ordenado (el mismo que usa describe), así que en caso de
+                # empate gana el menor.
+                ordered = column.sorted_non_null
+                var_type = type(ordered[0].item()).__name__
+                mode = _mode_of_sorted(ordered)
+            else:
+                # Inferimos el tipo del primer valor; la moda se calcula sobre los códigos.
+                var_type = type(column.categories[0]).__name__
+                counts = column.counts
+                candidates = np.flatnonzero(counts == counts.max())
+                mode = min(column.categories[i] for i in candidates)
             type_and_modes[col] = (var_type, mode)
-        return type_and_modes
\ No newline at end of file
+        return type_and_modes
+
+    def describe(self, columns: Union[List[str], str] = "all", percentiles: Sequence[float] = (25, 50, 75)) -> Dict[str, ColumnSummary]:
+        """Calcula en una sola pasada por columna la proporción de None, el tipo, la moda y,
+        para las columnas numéricas, media, desviación típica, mínimo, mediana, máximo y percentiles.
+        Los valores se ordenan una única vez y se reutilizan para todos los estadísticos de orden.
+        """
+        columns = self._filter_columns(columns)
+        total_rows = self.row_count
+        result = {}
+        for col, (var_type, mode) in self.type_and_mode(columns).items():
+            none_ratio = self.columns[col].null_count / total_rows if total_rows > 0 else 0.0
+            ordered = self._sorted_numeric_view(col)
+            if ordered is None or len(ordered) == 0:
+                result[col] = ColumnSummary(var_type, none_ratio, mode)
+                continue
+            # Interpolación lineal sobre los valores ya ordenados (equivalente a np.percentile)
+            ranks = np.asarray(percentiles, dtype=float) / 100.0 * (len(ordered) - 1)
+            quantiles = np.interp(ranks, np.arange(len(ordered)), ordered)
+            result[col] = ColumnSummary(
+                type=var_type,
+                none_ratio=none_ratio,
+                mode=mode,
+                mean=float(np.mean(ordered)),
+                std=float(np.std(ordered, ddof=1)) if len(ordered) > 1 else None,
+                minimum=float(ordered[0]),
+                median=float(np.interp((len(ordered) - 1) / 2, np.arange(len(ordered)), ordered)),
+                maximum=float(ordered[-1]),
+                percentiles={p: float(q) for p, q in zip(percentiles, quantiles)},
+            )
+        return result
@@ -1,12 +1,18 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Union, Any
+from typing import Dict, List, Union, Any, Optional
 import polars as pl
 
+from .cache import DatasetCache
+from .cleaner import Cleaner
+from .table import LazyTable, TableRows
+
 @dataclass
 class DataLoader:
-    """Class for loading and basic processing of real estate data."""
+    """Class for loading and basic processing of real estate data.
+    With a DatasetCache, load_table reuses the parsed table of previous runs."""
     data_path: Path
+    cache: Optional[DatasetCache] = None
     
     def load_data_from_csv(self) -> List[Dict[str, Any]]:
         """Load data from CSV file into a list of dictionaries."""
@@ -19,12 +25,34 @@ class DataLoader:
         except Exception as e:
             raise RuntimeError(f"Error loading CSV: {e}")
     
-    def validate_columns(self, required_columns: List[str]) -> bool:
-        """Validate that all required columns are present in the dataset."""
+    def scan_csv(self) -> LazyTable:
+        """Lazily scan the CSV file. Nothing is parsed until rows are requested."""
+        try:
+            return LazyTable(pl.scan_csv(self.data_path, infer_schema_length=10000))
+        except Exception as e:
+            raise RuntimeError(f"Error scanning CSV: {e}")
+
+    def load_table(self, clean: bool = False) -> TableRows:
+        """Load data from CSV file into Arrow memory, cleaned with Cleaner if clean=True.
 
-        dataset = self.load_data_from_csv()
-        existing_columns = dataset[0].keys()
+        The result behaves like the list of dictionaries returned by load_data_from_csv
+        (rows are built on demand), so it can be passed to Cleaner or Descriptor.
+        """
+        try:
+            if self.cache is not None:
+                return self.cache.load(self.data_path, clean)
+            table = TableRows(pl.read_csv(self.data_path, infer_schema_length=10000))
+        except Exception as e:
+            raise RuntimeError(f"Error loading CSV: {e}")
+        if clean:
+            cleaner = Cleaner(table)
+            cleaner.rename_with_best_practices()
+            table = cleaner.na_to_none()
+        return table
 
-        return all(column in existing_columns for column in required_columns)
+    def validate_columns(self, required_columns: List[str]) -> bool:
+        """Validate that all required columns are present in the dataset.
+        Only the header is read (no type inference, no rows)."""
 
-    
+        header = LazyTable(pl.scan_csv(self.data_path, infer_schema_length=0))
+        return header.validate_columns(required_columns)
@@ -0,0 +1,160 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+import multiprocessing
+import os
+import polars as pl
+
+from .sketches import ColumnSketch, merge_sketches, sketch_frame, update_sketches
+from .streaming import StreamingDescriptor, clean_csv_frame, iter_batches, scan_clean_csv
+
+
+def _sketch_rows(rows: List[Dict[str, Any]], shard: int, k: int, capacity: int, seed: int) -> Dict[str, ColumnSketch]:
+    """Worker: partial aggregates of one slice of an in-memory dataset."""
+    frame = pl.DataFrame(rows, infer_schema_length=None)
+    return sketch_frame(frame, k, capacity, seed, shard)
+
+
+def _sketch_csv(path: str, shard: int, k: int, capacity: int, seed: int, clean: bool, chunk_size: int,
+                schema: Dict[str, pl.DataType]) -> Optional[Dict[str, ColumnSketch]]:
+    """Worker: partial aggregates of one CSV shard, read in chunks with the shared schema."""
+    return _sketch_chunks(iter_batches(scan_clean_csv(Path(path), clean, schema), chunk_size), k, capacity, seed, shard)
+
+
+def _sketch_csv_range(path: str, shard: int, k: int, capacity: int, seed: int, clean: bool, chunk_size: int,
+                      schema: Dict[str, pl.DataType], start: int, end: int) -> Optional[Dict[str, ColumnSketch]]:
+    """Worker: partial aggregates of the lines of a CSV from byte start to byte end (both
+    at the start of a line), parsed chunk_size lines at a time with the shared schema."""
+    with open(path, "rb") as file:
+        header = file.readline()
+        chunks = (
+            clean_csv_frame(pl.read_csv(header + block, schema=schema).lazy(), clean).collect()
+            for block in _line_blocks(file, start, end, chunk_size)
+        )
+        return _sketch_chunks(chunks, k, capacity, seed, shard)
+
+
+def _sketch_chunks(chunks: Iterator[pl.DataFrame], k: int, capacity: int, seed: int,
+                   shard: int) -> Optional[Dict[str, ColumnSketch]]:
+    sketches = None
+    for chunk in chunks:
+        if sketches is None:
+            sketches = sketch_frame(chunk, k, capacity, seed, shard)
+        else:
+            update_sketches(sketches, chunk, shard)
+    return sketches
+
+
+def _line_blocks(file: BinaryIO, start: int, end: int, lines: int) -> Iterator[bytes]:
+    """The lines of a binary file from byte start to byte end, joined in blocks of at most
+    `lines` lines."""
+    file.seek(start)
+    position = start
+    while position < end:
+        block = []
+        for line in file:
+            block.append(line)
+            position += len(line)
+            if len(block) == lines or position >= end:
+                break
+        if not block:
+            return
+        yield b"".join(block)
+
+
+def _shared_schema(paths: List[Path]) -> Dict[str, pl.DataType]:
+    """One schema to read every CSV shard with, so a column has the same kind in every
+    partial sketch: the types inferred from each shard (as scan_clean_csv infers them),
+    widened to their common supertype (e.g. Int64 and Float64 to Float64, anything and
+    String to String)."""
+    schemas = [pl.scan_csv(path, infer_schema_length=10000).collect_schema() for path in paths]
+    if len(schemas) == 1:
+        return dict(schemas[0])
+    return dict(pl.concat([pl.DataFrame(schema=schema) for schema in schemas], how="diagonal_relaxed").schema)
+
+
+def _line_starts(path: Path, parts: int) -> List[int]:
+    """Byte offsets splitting the rows of a CSV (after its header) into about `parts`
+    ranges of equal size, each starting at a line, followed by the file size."""
+    size = path.stat().st_size
+    with open(path, "rb") as file:
+        file.readline()
+        starts = [file.tell()]
+        for part in range(1, parts):
+            file.seek(max(starts[-1], starts[0] + (size - starts[0]) * part // parts) - 1)
+            # The next line after the target byte (the target itself if a line starts there)
+            file.readline()
+            if file.tell() < size and file.tell() > starts[-1]:
+                starts.append(file.tell())
+    return starts + [size]
+
+
+@dataclass
+class ParallelDescriptor(StreamingDescriptor):
+    """Descriptor that computes partial aggregates in a pool of processes.
+
+    `data_path` is either a CSV file (split at line starts into `workers` byte ranges,
+    so every worker parses only its own rows; values in quotes must not span lines), a
+    directory of CSV shards (one task per file, in name order, which defines the row order
+    used to break ties between modes, all read with the column types inferred from the
+    shards, widened to a common type) or, through from_rows, an in-memory list of
+    dictionaries split into `workers` slices.
+    Each worker builds the column sketches of its share and the parent merges them:
+    counts, sums and Welford moments merge exactly, quantiles and modes are merged
+    sketches with the error bounds documented in StreamingDescriptor.
+    """
+    workers: Optional[int] = None
+    rows: Optional[List[Dict[str, Any]]] = None
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], **kwargs) -> "ParallelDescriptor":
+        """Describe an in-memory list of dictionaries (for example Cleaner output)."""
+        return cls(data_path=None, rows=rows, **kwargs)
+
+    @property
+    def shards(self) -> List[Path]:
+        path = Path(self.data_path)
+        if path.is_dir():
+            return sorted(path.glob("*.csv"))
+        return [path]
+
+    def fit(self) -> Dict[str, ColumnSketch]:
+        """Compute the sketches of every shard in parallel and merge them in shard order."""
+        workers = self.workers or os.cpu_count() or 1
+        settings = (self.quantile_accuracy, self.mode_capacity, self.seed)
+
+        # polars is multithreaded, so workers are spawned rather than forked
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            if self.rows is not None:
+                size = max(1, -(-len(self.rows) // workers))
+                futures = [
+                    pool.submit(_sketch_rows, self.rows[start:start + size], shard, *settings)
+                    for shard, start in enumerate(range(0, len(self.rows), size))
+                ]
+            else:
+                schema = _shared_schema(self.shards)
+                settings += (self.clean, self.chunk_size, schema)
+                if len(self.shards) == 1:
+                    path = self.shards[0]
+                    starts = _line_starts(path, workers)
+                    futures = [
+                        pool.submit(_sketch_csv_range, str(path), shard, *settings, start, end)
+                        for shard, (start, end) in enumerate(zip(starts, starts[1:]))
+                    ]
+                else:
+                    futures = [
+                        pool.submit(_sketch_csv, str(path), shard, *settings)
+                        for shard, path in enumerate(self.shards)
+                    ]
+            partials = [future.result() for future in futures]
+
+        partials = [partial for partial in partials if partial is not None]
+        if not partials:
+            raise RuntimeError(f"No rows found in {self.data_path}")
+        sketches = partials[0]
+        for partial in partials[1:]:
+            merge_sketches(sketches, partial)
+        self._sketches = sketches
+        return sketches
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Union
+import polars as pl
+
+from .cleaner import na_to_null, snake_case_mapping
+from .sketches import ColumnSketch, kll_rank_error, sketch_frame, update_sketches
+from .table import iter_batches
+
+
+def scan_clean_csv(data_path: Path, clean: bool = True,
+                   schema: Optional[Dict[str, pl.DataType]] = None) -> pl.LazyFrame:
+    """Lazily scan a CSV with the same schema inference as DataLoader.
+
+    With clean=True the columns are renamed to snake_case and "NA" strings become null,
+    which is what Cleaner does on the list of dictionaries. schema overrides the inferred
+    types of its columns (e.g. to read every shard of a dataset with the same types).
+    """
+    return clean_csv_frame(pl.scan_csv(data_path, infer_schema_length=10000, schema_overrides=schema), clean)
+
+
+def clean_csv_frame(lazy: pl.LazyFrame, clean: bool = True) -> pl.LazyFrame:
+    """The cleaning of scan_clean_csv, on a CSV already read or scanned."""
+    if not clean:
+        return lazy
+    lazy = lazy.rename(snake_case_mapping(lazy.collect_schema().names()))
+    return lazy.with_columns(na_to_null(lazy.collect_schema()))
+
+
+@dataclass
+class StreamingDescriptor:
+    """Descriptor for CSV files larger than memory.
+
+    The file is read in chunks of `chunk_size` rows and every column is summarised
+    with mergeable sketches, so memory is bounded by the chunk size and the sketches:
+    - none ratio, average, min/max and std are exact (counts, sums and Welford moments),
+    - median and percentile use a KLL sketch with parameter `quantile_accuracy` (k).
+      They are exact while a column has at most k values; otherwise the returned value
+      is the exact percentile of a rank within +/- kll_rank_error(k) of the requested
+      one with 99% confidence (k=200: 1.3%, k=1000: 0.3%). Memory per column is O(k log n).
+    - type_and_mode keeps the `mode_capacity` most frequent values per column (HeavyHitters).
+      It is exact while a column has at most that many distinct values; otherwise the
+      sketch's `error` attribute bounds the undercount of every value.
+    Results have the same format and validation rules as Descriptor.
+    """
+    data_path: Path
+    chunk_size: int = 100_000
+    quantile_accuracy: int = 200
+    mode_capacity: int = 1024
+    clean: bool = True
+    seed: int = 0
+
+    def __post_init__(self):
+        self._sketches: Optional[Dict[str, ColumnSketch]] = None
+
+    @property
+    def rank_error(self) -> float:
+        """Documented normalized rank error of median and percentile once a column is compacted."""
+        return kll_rank_error(self.quantile_accuracy)
+
+    @property
+    def sketches(self) -> Dict[str, ColumnSketch]:
+        """Column sketches, computed on first use with a single pass over the file."""
+        if self._sketches is None:
+            self._sketches = self.fit()
+        return self._sketches
+
+    def fit(self) -> Dict[str, ColumnSketch]:
+        """Stream the file and build one sketch per column."""
+        sketches = None
+        for chunk in iter_batches(scan_clean_csv(self.data_path, self.clean), self.chunk_size):
+            if sketches is None:
+                sketches = sketch_frame(chunk, self.quantile_accuracy, self.mode_capacity, self.seed)
+            else:
+                update_sketches(sketches, chunk)
+        if sketches is None:
+            raise RuntimeError(f"No rows found in {self.data_path}")
+        self._sketches = sketches
+        return sketches
+
+    def _select(self, columns: Union[List[str], str]) -> List[str]:
+        if columns == "all":
+            return list(self.sketches)
+        for column in columns:
+            if column not in self.sketches:
+                raise Exception("Invalid column")
+        return columns
+
+    def _select_numeric(self, columns: Union[List[str], str]) -> List[str]:
+        def is_number(column: str) -> bool:
+            return isinstance(self.sketches[column].first_value, (int, float))
+
+        if columns == "all":
+            columns = [column for column in self.sketches if is_number(column)]
+            if len(columns) != len(self.sketches):
+                raise Exception("Some columns does not correspond to numeric variables")
+        else:
+            columns = self._select(columns)
+            if not all(is_number(column) for column in columns):
+                raise Exception("Some columns does not correspond to numeric variables")
+        return columns
+
+    def none_ratio(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+        """Compute the ratio of None value per column (exact)."""
+        ratios = {}
+        for col in self._select(columns):
+            sketch = self.sketches[col]
+            ratios[col] = sketch.nulls / sketch.rows if sketch.rows > 0 else 0
+        return ratios
+
+    def average(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+        """Compute the average value for numeric variables (exact)."""
+        return {col: self.sketches[col].moments.average for col in self._select_numeric(columns)}
+
+    def median(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+        """Compute the median for numeric variables (see the class docstring for the error bound)."""
+        return {col: self.sketches[col].quantiles.median() for col in self._select_numeric(columns)}
+
+    def percentile(self, columns: Union[List[str], str] = "all", percentile: int = 50) -> Dict[str, float]:
+        """Compute a percentile for numeric variables (see the class docstring for the error bound)."""
+        return {col: self.sketches[col].quantiles.percentile(percentile) for col in self._select_numeric(columns)}
+
+    def type_and_mode(self, columns: Union[List[str], str] = "all") -> Dict[str, Tuple[str, Any]]:
+        """Compute the type and mode for variables."""
+        result = {}
+        for col in self._select(columns):
+            sketch = self.sketches[col]
+            if sketch.first_kind is None:
+                result[col] = ("Unknown", None)
+            else:
+                result[col] = (sketch.first_kind, sketch.modes.mode())
+        return result
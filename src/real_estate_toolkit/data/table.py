@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Any, Sequence, Union, overload
+import polars as pl
+
+
+def iter_batches(lazy: pl.LazyFrame, chunk_size: int) -> Iterator[pl.DataFrame]:
+    """Yield the rows of a lazy frame in chunks of at most chunk_size rows."""
+    if hasattr(lazy, "collect_batches"):
+        yield from lazy.collect_batches(chunk_size=chunk_size)
+        return
+    # Older polars: slice the scan, which keeps memory bounded at the cost of re-reading
+    offset = 0
+    while True:
+        chunk = lazy.slice(offset, chunk_size).collect()
+        if len(chunk) == 0:
+            return
+        yield chunk
+        offset += len(chunk)
+
+
+class TableRows(Sequence):
+    """Read-only list of dictionaries backed by a polars DataFrame.
+
+    Rows are only turned into dictionaries when they are accessed (again on every access),
+    so code written for List[Dict[str, Any]] keeps working while the data stays in Arrow
+    memory. Cleaner and the descriptors recognize it and work on the columns instead; use
+    `frame` to get to them directly.
+    """
+
+    def __init__(self, frame: pl.DataFrame):
+        self.frame = frame
+
+    def __len__(self) -> int:
+        return self.frame.height
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TableRows": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], "TableRows"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return TableRows(self.frame.gather(range(start, stop, step)))
+            return TableRows(self.frame.slice(start, max(stop - start, 0)))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TableRows index out of range")
+        return self.frame.row(index, named=True)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.frame.iter_rows(named=True, buffer_size=10000)
+
+    def __repr__(self) -> str:
+        return f"TableRows({self.frame.height} rows x {self.frame.width} columns)"
+
+    @property
+    def columns(self) -> List[str]:
+        return self.frame.columns
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize every row as a dictionary."""
+        return self.frame.to_dicts()
+
+
+@dataclass
+class LazyTable:
+    """Lazy polars scan of a dataset.
+
+    Nothing is read until rows are requested: the columns come from the schema and
+    rows are produced batch by batch. It is not a sequence; the descriptors collect it
+    into a TableRows first.
+    """
+    lazy_frame: pl.LazyFrame
+
+    @property
+    def schema(self) -> pl.Schema:
+        return self.lazy_frame.collect_schema()
+
+    @property
+    def columns(self) -> List[str]:
+        return self.schema.names()
+
+    def validate_columns(self, required_columns: Sequence[str]) -> bool:
+        """Validate that all required columns are present, from the schema only."""
+        existing_columns = set(self.columns)
+        return all(column in existing_columns for column in required_columns)
+
+    def iter_batches(self, batch_size: int = 100_000) -> Iterator[pl.DataFrame]:
+        return iter_batches(self.lazy_frame, batch_size)
+
+    def iter_rows(self, batch_size: int = 100_000) -> Iterator[Dict[str, Any]]:
+        """Yield the rows as dictionaries, reading batch_size rows at a time."""
+        for batch in self.iter_batches(batch_size):
+            yield from batch.iter_rows(named=True)
+
+    def collect(self) -> TableRows:
+        """Read the whole table into Arrow memory, without building dictionaries."""
+        return TableRows(self.lazy_frame.collect())
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 # Modules you can use (not all are mandatory):
 from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
@@ -15,22 +15,29 @@ from sklearn.metrics import (
 )
 import polars as pl  # Polars should be used for data handling.
 
+from ..data.cache import DatasetCache
+
 
 class HousePricePredictor:
-    def __init__(self, train_data_path: str, test_data_path: str):
+    def __init__(self, train_data_path: str, test_data_path: str, cache: Optional[DatasetCache] = None):
         """
         Initialize the predictor class with paths to the training and testing datasets.
         
         Args:
             train_data_path (str): Path to the training dataset CSV file.
             test_data_path (str): Path to the testing dataset CSV file.
+            cache (DatasetCache): Optional cache, reuses the parsed tables of previous runs.
         
         Attributes to Initialize:
             - self.train_data: Polars DataFrame for the training dataset.
             - self.test_data: Polars DataFrame for the testing dataset.
         """
-        self.train_data = pl.read_csv("train.csv")
-        self.test_data = pl.read_csv("test.csv")
+        if cache is not None:
+            self.train_data = cache.load(train_data_path).frame
+            self.test_data = cache.load(test_data_path).frame
+        else:
+            self.train_data = pl.read_csv(train_data_path, infer_schema_length=10000)
+            self.test_data = pl.read_csv(test_data_path, infer_schema_length=10000)
     
     def clean_data(self):
         """
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from real_estate_toolkit.agent_based_model.affordability import (
+    AffordabilityEngine,
+    max_affordable_prices,
+    mortgage_annuity_factor,
+)
+from real_estate_toolkit.agent_based_model.consumers import Segment
+from real_estate_toolkit.agent_based_model.store import ConsumerStore
+
+
+def test_hand_computed_prices():
+    # 100,000 a year at 36% DTI pays 3,000 a month; at 6% over 30 years, 0.5% a month for
+    # 360 months, that repays 3,000 * (1 - 1.005**-360) / 0.005 = 500,374.84
+    prices = max_affordable_prices(
+        savings=[200_000.0, 60_000.0], annual_income=100_000.0, interest_rate=0.06,
+        down_payment_percentage=0.2, debt_to_income_ratio=0.36, mortgage_years=30,
+    )
+    # The payments bound the first consumer, the 20% down payment the second (60,000 / 0.2)
+    assert prices[0] == pytest.approx(700_374.84, abs=0.01)
+    assert prices[1] == 300_000.0
+
+
+def test_zero_interest_limit():
+    assert mortgage_annuity_factor(0.0, 30) == 360
+    # Continuous at 0: no cancellation for tiny rates
+    assert mortgage_annuity_factor(1e-12, 30) == pytest.approx(360, rel=1e-9)
+    assert mortgage_annuity_factor([1e-9, 0.06], 30)[0] == pytest.approx(360, rel=1e-6)
+    prices = max_affordable_prices(0.0, 100_000.0, 0.0, down_payment_percentage=0)
+    assert prices == pytest.approx(3_000 * 360)
+
+
+def test_cache_recomputes_only_changed_consumers(monkeypatch):
+    generator = np.random.default_rng(0)
+    store = ConsumerStore.from_columns(
+        annual_income=generator.uniform(20_000, 150_000, 500),
+        children_number=generator.integers(0, 4, 500),
+        segment=np.full(500, Segment.AVERAGE.value),
+        savings=generator.uniform(0, 200_000, 500),
+        interest_rate=generator.uniform(0.01, 0.08, 500),
+    )
+    engine = AffordabilityEngine()
+    computed = []
+    compute = engine._compute
+    monkeypatch.setattr(engine, "_compute", lambda *inputs: computed.append(len(inputs[0])) or compute(*inputs))
+
+    first = engine.max_prices(store).copy()
+    assert computed == [500]
+    assert engine.max_prices(store) is engine._max_prices
+    assert computed == [500]
+
+    store.savings[[3, 77]] += 10_000
+    store.interest_rate[200] = 0.02
+    prices = engine.max_prices(store)
+    assert computed == [500, 3]
+    assert np.array_equal(prices, AffordabilityEngine().max_prices(store))
+    unchanged = np.ones(500, dtype=bool)
+    unchanged[[3, 77, 200]] = False
+    assert np.array_equal(prices[unchanged], first[unchanged])
+
+    engine.mortgage_years = 15
+    engine.max_prices(store)
+    assert computed == [500, 3, 500]
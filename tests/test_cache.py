@@ -0,0 +1,85 @@
+import os
+
+import polars as pl
+import pytest
+
+from real_estate_toolkit.data import cache as cache_module
+from real_estate_toolkit.data.cache import DatasetCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "houses.csv"
+    path.write_text("Id,SalePrice,PoolQC\n1,200000,NA\n2,150000,Gd\n")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(tmp_path / "cache")
+
+
+def entries(cache):
+    return sorted(path.name for path in cache.cache_dir.glob("*.arrow"))
+
+
+def count_parses(monkeypatch):
+    parses = []
+    read_csv = pl.read_csv
+    monkeypatch.setattr(cache_module.pl, "read_csv", lambda *args, **kwargs: parses.append(args) or read_csv(*args, **kwargs))
+    return parses
+
+
+def test_hit_reuses_the_entry(cache, source, monkeypatch):
+    parses = count_parses(monkeypatch)
+    first = cache.load(source, clean=True)
+    second = DatasetCache(cache.cache_dir).load(source, clean=True)
+
+    assert len(parses) == 1
+    assert second.frame.equals(first.frame)
+    assert second.frame.columns == ["id", "sale_price", "poolqc"]
+    assert second.frame["poolqc"].to_list() == [None, "Gd"]
+
+
+def test_changed_source_is_a_miss_and_replaces_the_stale_entry(cache, source):
+    cache.load(source)
+    [stale] = entries(cache)
+    source.write_text("Id,SalePrice,PoolQC\n1,250000,NA\n")
+    # A new mtime even on filesystems with a coarse clock
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert cache.load(source).frame["SalePrice"].to_list() == [250000]
+    assert entries(cache) != [stale] and len(entries(cache)) == 1
+
+
+def test_cleaning_configuration_is_part_of_the_key(cache, source, monkeypatch):
+    parses = count_parses(monkeypatch)
+    raw, clean = cache.load(source), cache.load(source, clean=True)
+    assert raw.frame.columns == ["Id", "SalePrice", "PoolQC"] and clean.frame.columns[0] == "id"
+    # Raw and clean entries live side by side
+    assert len(entries(cache)) == 2
+
+    before = entries(cache)
+    cache.infer_schema_length = 1
+    cache.load(source, clean=True)
+    assert len(parses) == 3
+    assert len(entries(cache)) == 2 and entries(cache) != before
+
+
+def test_new_version_invalidates_the_entry(cache, source, monkeypatch):
+    parses = count_parses(monkeypatch)
+    cache.load(source)
+    [old] = entries(cache)
+    monkeypatch.setattr(cache_module, "__version__", "999.0.0")
+    cache.load(source)
+
+    assert len(parses) == 2
+    assert entries(cache) != [old] and len(entries(cache)) == 1
+
+
+def test_clear_removes_every_entry(cache, source):
+    cache.load(source)
+    cache.load(source, clean=True)
+    cache.clear()
+    assert entries(cache) == []
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from real_estate_toolkit.agent_based_model.clearing import ClearingEngine
+from real_estate_toolkit.agent_based_model.consumers import Consumer, Segment
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.houses import House, QualityScore
+from real_estate_toolkit.agent_based_model.store import ConsumerStore, HouseStore
+
+
+def make_houses(count=300, seed=0):
+    generator = random.Random(seed)
+    return [
+        House(
+            id=index + 1,
+            price=float(generator.randrange(60_000, 400_000, 1000)),
+            area=float(generator.randrange(3_000, 15_000)),
+            bedrooms=generator.randint(1, 5),
+            year_built=generator.randint(1950, 2023),
+            quality_score=generator.choice(list(QualityScore)),
+        )
+        for index in range(count)
+    ]
+
+
+def make_consumers(count=400, seed=1):
+    generator = random.Random(seed)
+    return [
+        Consumer(
+            id=index,
+            annual_income=generator.uniform(20_000, 150_000),
+            children_number=generator.randint(0, 4),
+            segment=generator.choice(list(Segment)),
+            house=None,
+            savings=generator.uniform(0, 450_000),
+        )
+        for index in range(count)
+    ]
+
+
+def test_no_house_is_sold_twice():
+    market = HousingMarket(make_houses())
+    consumers = make_consumers()
+    report = ClearingEngine(market).clear(consumers)
+
+    owned = [consumer.house.id for consumer in consumers if consumer.house is not None]
+    assert report.matches == len(owned) > 0
+    assert len(set(owned)) == len(owned)
+    assert sum(not house.available for house in market.houses) == len(owned)
+
+
+def test_clearing_continues_after_a_consumer_who_cannot_buy():
+    market = HousingMarket(make_houses())
+    consumers = make_consumers()
+    broke = Consumer(id=-1, annual_income=10_000, children_number=0, segment=Segment.AVERAGE, house=None, savings=0.0)
+    report = ClearingEngine(market).clear([broke] + consumers)
+
+    assert broke.house is None
+    assert report.consumers == len(consumers) + 1
+    assert report.matches == sum(consumer.house is not None for consumer in consumers) > 0
+
+
+def test_object_and_store_clearing_match():
+    houses, consumers = make_houses(), make_consumers()
+    order = list(range(len(consumers)))
+    random.Random(2).shuffle(order)
+
+    object_report = ClearingEngine(HousingMarket(houses)).clear(consumers, order)
+
+    house_store = HouseStore.from_houses(make_houses())
+    consumer_store = ConsumerStore.from_consumers(make_consumers(), houses=house_store)
+    store_report = ClearingEngine(HousingMarket.from_store(house_store)).clear(consumer_store, order)
+
+    assert store_report.matches == object_report.matches
+    assert [view.house.id if view.house is not None else None for view in consumer_store] == \
+        [consumer.house.id if consumer.house is not None else None for consumer in consumers]
+
+
+def test_store_clearing_needs_the_market_of_its_house_store():
+    house_store = HouseStore.from_houses(make_houses())
+    consumer_store = ConsumerStore.from_consumers(make_consumers(), houses=house_store)
+    with pytest.raises(ValueError):
+        ClearingEngine(HousingMarket(make_houses())).clear(consumer_store)
@@ -0,0 +1,48 @@
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from real_estate_toolkit.data.cleaner import Cleaner
+from real_estate_toolkit.data.descriptor import Descriptor, DescriptorNumpy
+from real_estate_toolkit.data.loader import DataLoader
+
+TRAIN_CSV = Path(__file__).resolve().parents[1] / "src" / "files" / "train.csv"
+
+
+@pytest.fixture(scope="module")
+def table():
+    return DataLoader(TRAIN_CSV).load_table(clean=True)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_descriptor_on_tables_matches_rows(table, lazy):
+    rows = table.to_dicts()
+    data = table
+    if lazy:
+        cleaner = Cleaner(DataLoader(TRAIN_CSV).scan_csv())
+        cleaner.rename_with_best_practices()
+        data = cleaner.na_to_none()
+    on_table, on_rows = Descriptor(data), Descriptor(rows)
+    numeric = [column for column, (kind, _) in on_rows.type_and_mode().items() if kind == "Numeric"]
+
+    assert on_table.none_ratio() == on_rows.none_ratio()
+    assert on_table.type_and_mode() == on_rows.type_and_mode()
+    assert on_table.average(numeric) == pytest.approx(on_rows.average(numeric))
+    assert on_table.median(numeric) == on_rows.median(numeric)
+    assert on_table.percentile(numeric, 90) == on_rows.percentile(numeric, 90)
+    described, expected = on_table.describe(), on_rows.describe()
+    for column in expected:
+        summary, reference = asdict(described[column]), asdict(expected[column])
+        # std comes from np.std on the columns and statistics.stdev on the rows
+        assert summary.pop("std") == pytest.approx(reference.pop("std"), rel=1e-12), column
+        assert summary == reference, column
+
+
+def test_descriptor_rejects_unknown_columns_on_tables(table):
+    with pytest.raises(Exception, match="Invalid column"):
+        Descriptor(table).none_ratio(["not_a_column"])
+
+
+def test_descriptor_numpy_on_table_matches_rows(table):
+    assert DescriptorNumpy(table).describe() == DescriptorNumpy(table.to_dicts()).describe()
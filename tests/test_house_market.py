@@ -0,0 +1,150 @@
+import random
+
+import numpy as np
+import pytest
+
+from real_estate_toolkit.agent_based_model.consumers import Segment
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.houses import House, QualityScore
+from real_estate_toolkit.agent_based_model.profiling import Profiler
+from real_estate_toolkit.agent_based_model.store import HouseStore, HouseView
+
+
+def make_store(count=2000, seed=0):
+    generator = np.random.default_rng(seed)
+    return HouseStore.from_columns(
+        id=generator.permutation(count) * 3 + 7,
+        price=generator.integers(60, 400, count) * 1000.0,
+        area=generator.integers(3_000, 15_000, count).astype(float),
+        bedrooms=generator.integers(1, 6, count),
+        year_built=generator.integers(1950, 2024, count),
+        quality=generator.integers(0, 6, count),
+    )
+
+
+def assert_indexes_match_masks(market):
+    """The limit queries walk the price indexes; without a limit they filter the columns."""
+    generator = random.Random(5)
+    for _ in range(40):
+        max_price = generator.uniform(50_000, 450_000)
+        min_bedrooms = generator.randint(0, 4)
+        for segment in [None, Segment.FANCY, Segment.AVERAGE, Segment.OPTIMIZER]:
+            everything = market.query(max_price, segment, min_bedrooms)
+            assert market.query(max_price, segment, min_bedrooms, limit=9) == everything[:9]
+            assert market.query(max_price, segment, min_bedrooms, limit=1) == everything[:1]
+    available = market.columns()["available"]
+    assert available.sum() == sum(house.available for house in market.houses)
+    assert market.calculate_average_price() == pytest.approx(market.columns()["price"][available].mean())
+
+
+def test_store_market_views_are_created_on_access():
+    store = make_store()
+    market = HousingMarket.from_store(store)
+
+    house = market.get_house_by_id(int(store.id[10]))
+    assert isinstance(house, HouseView) and house._index == 10
+    assert market.houses[-1].id == int(store.id[-1])
+    with pytest.raises(Exception, match="No house found"):
+        market.get_house_by_id(2)
+
+
+def test_indexes_follow_sales_price_changes_and_restore():
+    market = HousingMarket.from_store(make_store())
+    snapshot = market.snapshot()
+    generator = random.Random(1)
+    for _ in range(600):
+        market.sell_cheapest_match(generator.uniform(60_000, 400_000), generator.choice(list(Segment)),
+                                   generator.randint(0, 3))
+    assert_indexes_match_masks(market)
+
+    # A few moves per index, then enough changes to sort the indexes again
+    prices = market.columns()["price"]
+    market.set_prices(np.arange(0, len(prices), 97), prices[::97] * 1.05)
+    market.update_price(market.houses[3].id, 1.0)
+    assert_indexes_match_masks(market)
+    market.set_prices(np.arange(0, len(prices), 2), prices[::2] * 0.9)
+    assert_indexes_match_masks(market)
+
+    market.restore(snapshot)
+    assert market.snapshot() == snapshot
+    assert_indexes_match_masks(market)
+
+
+def test_added_houses_are_indexed():
+    market = HousingMarket([
+        House(id=index, price=100_000.0 + index, area=5_000.0, bedrooms=2, year_built=1990,
+              quality_score=QualityScore.GOOD)
+        for index in range(1, 50)
+    ])
+    market.sell_house(1)
+    market.add_houses([
+        House(id=100, price=50_000.0, area=5_000.0, bedrooms=2, year_built=2023, quality_score=QualityScore.EXCELLENT),
+        House(id=0, price=100_001.0, area=5_000.0, bedrooms=3, year_built=1990, quality_score=None,
+              available=False),
+    ])
+
+    assert market.get_house_by_id(0).bedrooms == 3
+    assert [house.id for house in market.query(100_005, limit=3)] == [100, 2, 3]
+    assert [house.id for house in market.query(100_005, Segment.FANCY, limit=3)] == [100]
+    assert_indexes_match_masks(market)
+
+    # A house with more bedrooms than any other opens a new bucket
+    market.add_houses([House(id=200, price=90_000.0, area=5_000.0, bedrooms=4, year_built=1990, quality_score=None)])
+    assert [house.id for house in market.query(100_000, min_bedrooms=4, limit=1)] == [200]
+    assert market.query(100_000, min_bedrooms=5, limit=1) == []
+    assert [house.id for house in market.query(100_000, min_bedrooms=-1, limit=2)] == [100, 200]
+    with pytest.raises(Exception, match="already on the market"):
+        market.add_houses([House(id=5, price=1.0, area=1.0, bedrooms=1, year_built=2000, quality_score=None)])
+
+
+def test_limit_queries_count_the_houses_examined():
+    market = HousingMarket([
+        House(id=index, price=100_000.0 + index, area=5_000.0, bedrooms=2, year_built=1990,
+              quality_score=QualityScore.GOOD)
+        for index in range(1, 11)
+    ])
+    market.profiler = Profiler()
+    for house_id in range(1, 6):
+        market.sell_house(house_id)
+
+    # The 5 sold houses are skipped before the cheapest available one
+    assert market.query(200_000, limit=1)[0].id == 6
+    assert market.profiler.counters["houses_scanned"] == 6
+    assert market.query(200_000, limit=1)[0].id == 6
+    assert market.profiler.counters["houses_scanned"] == 7
+    assert [house.id for house in market.query(200_000, limit=3)] == [6, 7, 8]
+    assert market.profiler.counters["houses_scanned"] == 7 + 5
+
+
+def test_walks_skip_sold_houses_once():
+    market = HousingMarket([
+        House(id=index, price=100_000.0 + index, area=5_000.0, bedrooms=2, year_built=1990,
+              quality_score=QualityScore.GOOD)
+        for index in range(1, 11)
+    ])
+    market.profiler = Profiler()
+    for house_id in range(1, 10):
+        market.sell_house(house_id)
+
+    # The first walk reads the 5 sold houses under the bound, the next one starts after them
+    assert market.query(100_005, Segment.OPTIMIZER, limit=3) == []
+    assert market.profiler.counters["houses_scanned"] == 5
+    assert market.query(100_005, Segment.OPTIMIZER, limit=3) == []
+    assert market.profiler.counters["houses_scanned"] == 5
+    assert market.query(100_005, Segment.OPTIMIZER, limit=1) == []
+    assert market.profiler.counters["houses_scanned"] == 5 + 5
+    assert market.query(200_000, Segment.OPTIMIZER, limit=1)[0].id == 10
+
+    # Sold out: no walk at all
+    market.sell_house(10)
+    for segment in list(Segment) + [None]:
+        assert market.query(200_000, segment, limit=1) == []
+    assert market.profiler.counters["houses_scanned"] == 5 + 5 + 1
+
+
+def test_requirements_of_an_unknown_segment_match_nothing():
+    market = HousingMarket.from_store(make_store(200))
+    assert market.get_houses_that_meet_requirements(400_000, Segment.AVERAGE)
+    for segment in [None, "FANCY", 2]:
+        with pytest.raises(Exception, match="No houses found"):
+            market.get_houses_that_meet_requirements(400_000, segment)
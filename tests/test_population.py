@@ -0,0 +1,55 @@
+from math import exp, pi, sqrt
+
+import numpy as np
+import pytest
+
+from real_estate_toolkit.agent_based_model import population
+from real_estate_toolkit.agent_based_model.population import normal_cdf, truncated_normal
+
+
+def truncated_moments(mean, standard_deviation, minimum, maximum):
+    """Mean and standard deviation of a truncated normal distribution."""
+    lower, upper = (minimum - mean) / standard_deviation, (maximum - mean) / standard_deviation
+    density_lower, density_upper = (exp(-x * x / 2) / sqrt(2 * pi) for x in (lower, upper))
+    mass = normal_cdf(upper) - normal_cdf(lower)
+    shift = (density_lower - density_upper) / mass
+    variance = 1 + (lower * density_lower - upper * density_upper) / mass - shift ** 2
+    return mean + standard_deviation * shift, standard_deviation * sqrt(variance)
+
+
+@pytest.mark.parametrize("minimum, maximum", [
+    (30_000, 150_000),  # most draws accepted: rejection
+    (160_000, 170_000),  # far in the upper tail: inverse CDF
+    (-50_000, -40_000),  # far in the lower tail: inverse CDF
+])
+def test_samples_stay_within_the_bounds(minimum, maximum):
+    values = truncated_normal(np.random.default_rng(0), 50_000, 60_000, 20_000, minimum, maximum)
+    assert len(values) == 50_000
+    assert values.min() >= minimum and values.max() <= maximum
+    expected_mean, expected_std = truncated_moments(60_000, 20_000, minimum, maximum)
+    assert abs(values.mean() - expected_mean) < 5 * expected_std / sqrt(len(values))
+
+
+def test_rejection_and_inverse_cdf_agree(monkeypatch):
+    size, arguments = 200_000, (60_000, 20_000, 30_000, 100_000)
+    rejected = truncated_normal(np.random.default_rng(1), size, *arguments)
+    # No interval is likely enough for rejection sampling any more
+    monkeypatch.setattr(population, "MIN_ACCEPTANCE", 1.1)
+    inverted = truncated_normal(np.random.default_rng(2), size, *arguments)
+
+    expected_mean, expected_std = truncated_moments(*arguments)
+    standard_error = expected_std / sqrt(size)
+    for values in (rejected, inverted):
+        assert values.min() >= 30_000 and values.max() <= 100_000
+        assert abs(values.mean() - expected_mean) < 5 * standard_error
+        assert values.std() == pytest.approx(expected_std, rel=0.01)
+    assert abs(rejected.mean() - inverted.mean()) < 5 * sqrt(2) * standard_error
+
+
+def test_degenerate_distributions():
+    generator = np.random.default_rng(0)
+    assert truncated_normal(generator, 3, 50_000, 0, 40_000, 60_000).tolist() == [50_000] * 3
+    with pytest.raises(Exception, match="standard deviation is zero"):
+        truncated_normal(generator, 3, 70_000, 0, 40_000, 60_000)
+    with pytest.raises(Exception, match="minimum cannot be greater"):
+        truncated_normal(generator, 3, 50_000, 1_000, 60_000, 40_000)
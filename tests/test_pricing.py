@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from real_estate_toolkit.agent_based_model.consumers import Segment
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.houses import House, QualityScore
+from real_estate_toolkit.agent_based_model.pricing import PriceDynamics
+from real_estate_toolkit.agent_based_model.store import HouseStore
+
+
+def make_market(agent_store):
+    # Ten houses in each of three bedroom bands, same quality band
+    houses = [
+        House(id=bedrooms * 100 + index, price=100_000.0 + 1_000 * index, area=5_000.0, bedrooms=bedrooms,
+              year_built=1990, quality_score=QualityScore.GOOD)
+        for bedrooms in (1, 2, 4) for index in range(10)
+    ]
+    if agent_store:
+        return HousingMarket.from_store(HouseStore.from_houses(houses))
+    return HousingMarket(houses)
+
+
+@pytest.mark.parametrize("agent_store", [False, True])
+def test_prices_follow_excess_demand(agent_store):
+    market = make_market(agent_store)
+    before = {house.id: house.price for house in market.houses}
+    # 4 bedrooms: 10 sales and 20 buyers left without a house, demand 30 for a supply of 10
+    for _ in range(30):
+        market.sell_cheapest_match(500_000, None, min_bedrooms=4)
+    # 2 bedrooms: 9 sales for a supply of 10; 1 bedroom: no demand
+    for house_id in range(200, 209):
+        market.sell_house(house_id)
+
+    assert market.reprice(PriceDynamics(sensitivity=0.1, max_change=0.05)) == 30
+    for house in market.houses:
+        change = house.price / before[house.id]
+        expected = {4: 1.05, 2: 1 + 0.1 * (9 - 10) / 10, 1: 0.95}[house.bedrooms]
+        assert change == pytest.approx(expected)
+
+    # The running sums and the price indexes follow the new prices
+    available = [house for house in market.houses if house.available]
+    assert market.calculate_average_price() == pytest.approx(np.mean([house.price for house in available]))
+    assert market.calculate_average_price(2) == pytest.approx(market.get_house_by_id(209).price)
+    for segment in (None, Segment.AVERAGE, Segment.OPTIMIZER):
+        everything = market.query(500_000, segment)
+        assert everything == sorted(everything, key=lambda house: (house.price, house.id))
+        assert market.query(500_000, segment, limit=4) == everything[:4]
+        assert market.query(500_000, segment, limit=1) == everything[:1]
+
+    # A new period starts from the supply left: no demand lowers every price
+    market.reprice(PriceDynamics(sensitivity=0.1, max_change=0.05))
+    assert market.get_house_by_id(209).price == pytest.approx(before[209] * 0.99 * 0.95)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from real_estate_toolkit.agent_based_model.sensitivity import sobol_design, sobol_indices
+
+SAMPLES = 2 ** 14
+
+
+def ishigami(unit: np.ndarray, a: float = 7.0, b: float = 0.1) -> np.ndarray:
+    x = -np.pi + 2 * np.pi * unit
+    return np.sin(x[:, 0]) + a * np.sin(x[:, 1]) ** 2 + b * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+
+def test_sobol_indices_of_the_ishigami_function():
+    unit = sobol_design(3, SAMPLES, np.random.default_rng(0))
+    indices = sobol_indices(ishigami(unit), ["x1", "x2", "x3"], SAMPLES)
+    # Analytic values for a = 7, b = 0.1
+    expected = {
+        "x1": {"first_order": 0.3139, "total": 0.5576},
+        "x2": {"first_order": 0.4424, "total": 0.4424},
+        "x3": {"first_order": 0.0, "total": 0.2437},
+    }
+    for name, values in expected.items():
+        for index, value in values.items():
+            assert indices[name][index] == pytest.approx(value, abs=0.04), (name, index)
+
+
+def test_sobol_indices_of_a_linear_model_with_a_large_offset():
+    unit = sobol_design(2, SAMPLES, np.random.default_rng(1))
+    outputs = 1e6 + 2 * unit[:, 0] + unit[:, 1]
+    indices = sobol_indices(outputs, ["x1", "x2"], SAMPLES)
+    # Var(2 x1) = 4/12 and Var(x2) = 1/12: 80% and 20% of the variance, no interactions
+    for name, share in (("x1", 0.8), ("x2", 0.2)):
+        assert indices[name]["first_order"] == pytest.approx(share, abs=0.03)
+        assert indices[name]["total"] == pytest.approx(share, abs=0.03)
+
+
+def test_sobol_indices_are_invariant_under_affine_maps_of_the_output():
+    unit = sobol_design(3, 1024, np.random.default_rng(2))
+    outputs = ishigami(unit)
+    indices = sobol_indices(outputs, ["x1", "x2", "x3"], 1024)
+    for transformed in (outputs + 1000, 5 - 3 * outputs):
+        for name, values in sobol_indices(transformed, ["x1", "x2", "x3"], 1024).items():
+            assert values == pytest.approx(indices[name], abs=1e-9)
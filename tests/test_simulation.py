@@ -0,0 +1,138 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from real_estate_toolkit.agent_based_model.montecarlo import MonteCarloRunner
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, RandomStream, Simulation, SimulationEvent
+)
+from real_estate_toolkit.data.loader import DataLoader
+
+TRAIN_CSV = Path(__file__).resolve().parents[1] / "src" / "files" / "train.csv"
+INCOME = AnnualIncomeStatistics(minimum=30000.0, average=60000.0, standard_deviation=20000.0, maximum=150000.0)
+
+
+@pytest.fixture(scope="module")
+def housing_market_data():
+    return DataLoader(TRAIN_CSV).load_table(clean=True).to_dicts()
+
+
+def simulation(housing_market_data, seed, agent_store=False, **settings):
+    return Simulation(
+        housing_market_data=[dict(row) for row in housing_market_data],
+        consumers_number=300,
+        years=5,
+        annual_income=INCOME,
+        children_range=ChildrenRange(minimum=0, maximum=5),
+        cleaning_market_mechanism=settings.pop("cleaning_market_mechanism", CleaningMarketMechanism.RANDOM),
+        agent_store=agent_store,
+        seed=seed,
+        **settings,
+    )
+
+
+def run(simulation):
+    simulation.create_housing_market()
+    simulation.create_consumers()
+    simulation.compute_consumers_savings()
+    simulation.clean_the_market()
+    return simulation
+
+
+def population(simulation):
+    return [(consumer.id, consumer.annual_income, consumer.children_number, consumer.segment)
+            for consumer in simulation.consumers]
+
+
+def outcome(simulation):
+    return sorted((consumer.id, consumer.savings, consumer.house.id if consumer.house is not None else None)
+                  for consumer in simulation.consumers)
+
+
+@pytest.mark.parametrize("agent_store", [False, True])
+def test_same_seed_gives_the_same_run(housing_market_data, agent_store):
+    first = run(simulation(housing_market_data, 7, agent_store))
+    second = run(simulation(housing_market_data, 7, agent_store))
+    other = run(simulation(housing_market_data, 8, agent_store))
+    assert outcome(first) == outcome(second)
+    assert population(first) != population(other)
+
+
+@pytest.mark.parametrize("agent_store", [False, True])
+def test_other_streams_leave_the_population_unchanged(housing_market_data, agent_store):
+    plain = simulation(housing_market_data, 7, agent_store)
+    plain.create_consumers()
+    busy = simulation(housing_market_data, 7, agent_store)
+    busy.rng(RandomStream.MARKET_EVENTS).random(1000)
+    busy._random(RandomStream.ORDERING).shuffle(list(range(1000)))
+    busy.create_consumers()
+    assert population(busy) == population(plain)
+
+
+def test_same_seed_with_another_ordering_keeps_the_population(housing_market_data):
+    by_income = run(simulation(housing_market_data, 7, cleaning_market_mechanism=CleaningMarketMechanism.INCOME_ORDER_DESCENDANT))
+    shuffled = run(simulation(housing_market_data, 7, cleaning_market_mechanism=CleaningMarketMechanism.RANDOM))
+    assert sorted(population(by_income)) == sorted(population(shuffled))
+
+
+def test_a_generator_seed_is_a_source_of_randomness(housing_market_data):
+    generator = np.random.default_rng(3)
+    first = simulation(housing_market_data, generator)
+    first.create_consumers()
+    second = simulation(housing_market_data, generator)
+    second.create_consumers()
+    assert population(first) != population(second)
+
+    # ...and a generator in the same state gives the same run
+    again = simulation(housing_market_data, np.random.default_rng(3))
+    again.create_consumers()
+    assert population(again) == population(first)
+
+
+@pytest.mark.parametrize("agent_store", [False, True])
+def test_stepped_simulation_records_every_period(housing_market_data, agent_store):
+    stepped = simulation(housing_market_data, 5, agent_store)
+    new_house = dict(housing_market_data[0], id=100_000)
+
+    def before_clearing(simulation, period):
+        if period == 2:
+            simulation.list_houses([new_house])
+        if period == 3:
+            simulation.update_prices({100_000: new_house["sale_price"] * 2})
+
+    recorded = []
+    stepped.add_hook(SimulationEvent.BEFORE_CLEARING, before_clearing)
+    stepped.add_hook(SimulationEvent.AFTER_STEP, lambda simulation, statistics: recorded.append(statistics))
+    history = stepped.run(4)
+
+    assert recorded == history.periods
+    assert history.series("period") == [1, 2, 3, 4]
+    assert history.series("listed_houses") == [0, 1, 0, 0]
+    assert history.series("repriced_houses") == [0, 0, 1, 0]
+    owners = history.series("owners")
+    assert owners == sorted(owners) and owners[-1] == sum(history.series("matches")) > 0
+    houses = len(housing_market_data)
+    for row in history.to_dicts():
+        assert row["owners_rate"] == row["owners"] / 300
+        listed = houses + (row["period"] >= 2)
+        assert row["availability_rate"] == row["available_houses"] / listed
+        assert row["available_houses"] == listed - row["owners"]
+    assert stepped.housing_market.get_house_by_id(100_000).price == new_house["sale_price"] * 2
+
+
+def test_monte_carlo_results_do_not_depend_on_the_workers(housing_market_data):
+    def results(workers):
+        runner = MonteCarloRunner(
+            housing_market_data=housing_market_data,
+            consumers_number=300,
+            years=5,
+            annual_income=INCOME,
+            children_range=ChildrenRange(minimum=0, maximum=5),
+            workers=workers,
+            seed=11,
+        )
+        rows = runner.run({"interest_rate": [0.03, 0.06]}, replications=3)
+        return [{name: value for name, value in row.items() if name != "seconds"} for row in rows]
+
+    assert results(1) == results(3)
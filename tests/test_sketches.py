@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from real_estate_toolkit.data.parallel import ParallelDescriptor
+from real_estate_toolkit.data.sketches import HeavyHitters, KllSketch, MomentSketch, kll_rank_error
+from real_estate_toolkit.data.streaming import StreamingDescriptor
+
+TRAIN_CSV = Path(__file__).resolve().parents[1] / "src" / "files" / "train.csv"
+
+
+def test_kll_percentiles_within_rank_error():
+    values = np.random.default_rng(1).lognormal(12, 0.4, 200_000)
+    sketches = []
+    for shard in np.array_split(values, 4):
+        sketch = KllSketch(k=200, seed=len(sketches))
+        for chunk in np.array_split(shard, 10):
+            sketch.update(chunk)
+        sketches.append(sketch)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    assert merged.n == len(values) and not merged.exact
+    ordered = np.sort(values)
+    for percentile in range(1, 100):
+        # Normalized rank of the value the sketch answered
+        rank = np.searchsorted(ordered, merged.percentile(percentile)) / (len(values) - 1)
+        assert abs(rank - percentile / 100) <= kll_rank_error(200)
+
+
+def test_kll_is_exact_until_compacted():
+    values = np.random.default_rng(2).normal(size=150)
+    sketch = KllSketch(k=200)
+    sketch.update(values[:70])
+    sketch.update(values[70:])
+    assert sketch.exact
+    assert sketch.median() == pytest.approx(np.median(values))
+    assert sketch.percentile(25) == pytest.approx(np.percentile(values, 25))
+
+
+def test_merged_moments_match_numpy():
+    values = np.random.default_rng(3).normal(1e6, 250.0, 100_000)
+    merged = MomentSketch()
+    for chunk in np.array_split(values, 7):
+        partial = MomentSketch()
+        partial.update(chunk)
+        merged.merge(partial)
+    assert merged.count == len(values)
+    assert merged.average == pytest.approx(np.mean(values), rel=1e-14)
+    assert merged.std == pytest.approx(np.std(values, ddof=1), rel=1e-9)
+    assert (merged.minimum, merged.maximum) == (values.min(), values.max())
+
+
+def test_merged_integer_sum_is_exact():
+    values = np.arange(1, 100_001, dtype=np.int64)
+    merged = MomentSketch()
+    for chunk in np.array_split(values, 3):
+        partial = MomentSketch()
+        partial.update(chunk)
+        merged.merge(partial)
+    assert merged.total == 100_000 * 100_001 // 2
+    assert merged.average == 50_000.5
+
+
+def test_heavy_hitters_merge_breaks_ties_by_first_position():
+    first, second = HeavyHitters(), HeavyHitters()
+    first.update(["a", "b"], [2, 3], [(0, 5), (0, 1)])
+    second.update(["a", "c"], [1, 1], [(1, 0), (1, 2)])
+    first.merge(second)
+    # a and b both count 3; b was seen first
+    assert first.exact and first.mode() == "b"
+
+
+@pytest.mark.parametrize("workers", [1, 3, 7])
+def test_parallel_descriptor_matches_streaming(workers):
+    # quantile_accuracy above the row count keeps both descriptors exact
+    settings = {"quantile_accuracy": 2000, "chunk_size": 500}
+    streaming = StreamingDescriptor(TRAIN_CSV, **settings)
+    parallel = ParallelDescriptor(TRAIN_CSV, workers=workers, **settings)
+    numeric = [column for column, (kind, _) in streaming.type_and_mode().items() if kind == "Numeric"]
+
+    assert parallel.none_ratio() == streaming.none_ratio()
+    assert parallel.type_and_mode() == streaming.type_and_mode()
+    assert parallel.average(numeric) == pytest.approx(streaming.average(numeric), rel=1e-12)
+    assert parallel.median(numeric) == streaming.median(numeric)
+    assert parallel.percentile(numeric, 90) == streaming.percentile(numeric, 90)
+
+
+def test_parallel_descriptor_reads_shards_with_one_schema(tmp_path):
+    # On its own, the first shard would be read as integers and the second (with "NA") as strings
+    (tmp_path / "shards").mkdir()
+    (tmp_path / "shards" / "a.csv").write_text("Id,Rate\n1,2\n2,4\n")
+    (tmp_path / "shards" / "b.csv").write_text("Id,Rate\n3,NA\n4,1.5\n")
+    (tmp_path / "all.csv").write_text("Id,Rate\n1,2\n2,4\n3,NA\n4,1.5\n")
+    streaming = StreamingDescriptor(tmp_path / "all.csv")
+    parallel = ParallelDescriptor(tmp_path / "shards", workers=2)
+
+    assert parallel.type_and_mode() == streaming.type_and_mode()
+    assert parallel.none_ratio() == streaming.none_ratio()
+
+
+def test_parallel_descriptor_shards_match_the_whole_file(tmp_path):
+    header, *lines = TRAIN_CSV.read_text().splitlines(keepends=True)
+    for shard, start in enumerate(range(0, len(lines), 500)):
+        (tmp_path / f"{shard}.csv").write_text(header + "".join(lines[start:start + 500]))
+    settings = {"quantile_accuracy": 2000, "chunk_size": 300}
+    streaming = StreamingDescriptor(TRAIN_CSV, **settings)
+    parallel = ParallelDescriptor(tmp_path, workers=3, **settings)
+
+    assert parallel.none_ratio() == streaming.none_ratio()
+    assert parallel.type_and_mode() == streaming.type_and_mode()